@@ -1,22 +1,22 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 from scipy.optimize import minimize
 from scipy.interpolate import interp1d
-import sys
-import warnings
+
+import fopdt
+import stepdata
 
 # Import data file
 # Column 1 = time (t)
 # Column 2 = input (u)
 # Column 3 = output (yp)
-data_fan = pd.read_csv('a_Fan_step.csv', index_col=0)
-t = data_fan['Time'].to_numpy()
-u = data_fan['Fan'].to_numpy()
-y = data_fan['Tcpu'].to_numpy()
-q = data_fan['Q'].to_numpy()
-Ta = data_fan['T_air'].to_numpy()
+# memory-mapped columns from the binary copy of the CSV (see stepdata.py)
+data_fan = stepdata.load_step_test('a_Fan_step.csv')
+t = data_fan['Time']
+u = data_fan['Fan']
+y = data_fan['Tcpu']
+q = data_fan['Q']
+Ta = data_fan['T_air']
 
 # wait until steady state
 tsleep = 60
@@ -37,55 +37,18 @@ delta_t = t[1]-t[0]
 # create linear interpolation of the u data versus time
 uf = interp1d(t, u)
 
-# define first-order plus dead-time approximation
-def fopdt(y,t,uf,Km,taum,thetam):
-    # arguments
-    #  y      = output
-    #  t      = time
-    #  uf     = input linear function (for time shift)
-    #  Km     = model gain
-    #  taum   = model time constant
-    #  thetam = model time constant
-    # time-shift u
-    try:
-        if (t-thetam) <= 0:
-            um = uf(0.0)
-        else:
-            um = uf(t-thetam)
-    except:
-        #print('Error with time extrapolation: ' + str(t))
-        um = u0
-    # calculate derivative
-    dydt = (-(y-yp[0]) + Km * (um-u0))/taum
-    return dydt
-
 # simulate FOPDT model with x=[Km,taum,thetam]
+# (exact discrete-time solution, see fopdt.py)
 def sim_model(x):
-    # input arguments
-    Km = x[0]
-    taum = x[1]
-    thetam = x[2]
-    # storage for model values
-    ym = np.zeros(ns)  # model
-    # initial condition
-    ym[0] = yp[0]
-    # loop through time steps
-    for i in range(0,ns-1):
-        ts = [t[i],t[i+1]]
-        y1 = odeint(fopdt,ym[i],ts,args=(uf,Km,taum,thetam))
-        ym[i+1] = y1[-1]
-    return ym
+    return fopdt.simulate(x, t, u, yp[0], u0)
 
 # define objective
 def objective(x):
-    # simulate model
-    ym = sim_model(x)
-    # calculate objective
-    obj = 0.0
-    for k in range(len(ym)):
-        obj = obj + (ym[k]-yp[k])**2
-    # return result
-    return obj
+    return fopdt.sse(x, t, u, yp, u0)
+
+# objective and its exact gradient with respect to x
+def objective_grad(x):
+    return fopdt.sse_grad(x, t, u, yp, u0)
 
 # initial guesses
 x0 = np.zeros(3)
@@ -96,44 +59,27 @@ x0[2] = 1  # thetam
 #show initial objective
 print('Initial SSE Objective: ' + str(objective(x0)))
 
-# theta = np.linspace(0, 100, 100)
-# results = []
-# j = 1
-# for b in theta:
-#     x0 = [-802, 1, b]
-#     results.append(objective(x0))
-#     sys.stdout.write("\rDoing Test %d" % j)
-#     sys.stdout.flush()
-#     j += 1
-#
-# plt.figure(figsize=(10, 7))
-# plt.plot(theta, results)
-# plt.xlabel('Theta Value')
-# plt.ylabel('SSE Error')
-# min_err = min(results)
-# Kp_best = theta[results.index(min_err)]
+# sweep the objective over a range of theta on all cores; the SSE surface
+# is saved so the plot can be redrawn with fopdtsweep.plot_sweep(file).
+# sweep starts a process pool: with the spawn start method (Windows,
+# macOS) this script must then run under if __name__ == '__main__':
+# import fopdtsweep
+# surface = fopdtsweep.sweep(t, u, yp, [-802, 1, 0], {'thetam': np.linspace(0, 100, 100)},
+#                            u0=u0, out='theta_100Range.npz')
+# fopdtsweep.plot_sweep(surface, 'theta_100Range.png')
 # plt.show()
-# x = int(input('x Coordinate of text'))
-# y = int(input('Y coordinate of string'))
-#
-#
-# plt.figure(figsize=(10, 7))
-# plt.plot(theta, results)
-# plt.xlabel('Tau Value')
-# plt.ylabel('SSE Error')
-# min_err = min(results)
-# Kp_best = theta[results.index(min_err)]
-# plt.text(x,y, f'Min Err: {min_err}\nBest Theta: {Kp_best}')
-# plt.savefig(input('What should this be named?'))
-# plt.show()
-
 
 # optimize Km, taum, thetam
-solution = minimize(objective,x0)
+solution = minimize(objective_grad,x0,jac=True)
 
 # Another way to solve: with bounds on variables
 #bnds = ((0.4, 0.6), (1.0, 10.0), (0.0, 30.0))
-#solution = minimize(objective,x0,bounds=bnds,method='SLSQP')
+#solution = minimize(objective_grad,x0,jac=True,bounds=bnds,method='SLSQP')
+
+# Or without a hand-tuned guess: bounded multi-start fit across all cores
+# (a process pool: under spawn, run this script under if __name__ == '__main__':)
+#import fopdtident
+#solution = fopdtident.identify(t, u, yp, bounds=((-5000, 0), (0.01, 50), (0, 50)), x0=x0, u0=u0)
 x = solution.x
 
 # show final objective
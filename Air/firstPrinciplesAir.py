@@ -18,25 +18,85 @@ fan_ca = .120 ** 2  # fan cross sectional area (m^2)
 SP = 90 + 273.15  # K (Set Point Temperature)
 
 
-def sim_air(T, t, Q_CPU, vol_air, T_air):
-    θb = T - T_air
+def fin_conductance(vol_air, T_air, t=1.0):
+    '''
+    Heat removed by the fins per kelvin of CPU over air temperature (W/K),
+    Qfin = fin_conductance * (T - T_air). Arrays broadcast.
 
+    t is the solver time that enters the fin parameter m of sim_air. The
+    step tests restart the integration every sample, so sim_air sees t
+    run from 0 to 1 s in every sample; t=1.0 is the end of a sample.
+    Without air flow the conductance is nan.
+    '''
     vel_air = vol_air / fan_ca
-    μ = ap.vvs(Tinf)  # m^2/s (kinematic viscosity of air at ambient conditions)
     n = 50  # (number of fins)
     fin_gap_width = 10.5 / 100 / n  # m
 
     # Reynolds number from air properties
-    Re_air = n * vel_air * fin_gap_width / ap.nu1atm(T_air)
-    Nu_air = .680 * Re_air ** (.5) * ap.pr1atm(T_air)
-    h_air_fin = Nu_air * ap.vtc(T_air) / fin_gap_width
+    air = ap.props1atm(T_air)
+    Re_air = n * vel_air * fin_gap_width / air.nu
+    Nu_air = .680 * Re_air ** (.5) * air.pr
+    h_air_fin = Nu_air * air.k / fin_gap_width
 
     m = np.sqrt(2 * h_air_fin / (k_copper * t + .001))
-    M = np.sqrt(h_air_fin * P * k_copper * Ac) * θb
+    M = np.sqrt(h_air_fin * P * k_copper * Ac)
 
     # Following equation obtained from "Fundamentals of Heat and Mass Transfer" 8E by Bergman and Lavine
-    Qfin = M * ((np.sinh(m * L) + h_air_fin / m / k_copper * np.cosh(m * L)) / (
+    return M * ((np.sinh(m * L) + h_air_fin / m / k_copper * np.cosh(m * L)) / (
                 np.cosh(m * L) + h_air_fin / m / k_copper * np.sinh(m * L)))
 
+
+def sim_air(T, t, Q_CPU, vol_air, T_air):
+    '''
+    dT/dt of the CPU with fins (odeint signature). T, Q_CPU, vol_air and
+    T_air may be arrays of operating points, which are evaluated together.
+    '''
+    θb = T - T_air
+    Qfin = fin_conductance(vol_air, T_air, t) * θb
+
     dTCPUdt = Q_CPU - Qfin
     return dTCPUdt
+
+
+def sim_air_jac(T, t, Q_CPU, vol_air, T_air):
+    '''Analytic Jacobian of sim_air for the one-element state T, [[-fin_conductance]].'''
+    return np.array([[-fin_conductance(vol_air, T_air, t)]], dtype=float)
+
+
+def steady_state(Q_CPU, vol_air, T_air, t=1.0):
+    '''
+    CPU temperature where Q_CPU == Qfin at solver time t, for arrays of
+    operating points. Qfin is linear in T - T_air, so the root is
+    T_air + Q_CPU / fin_conductance. See sampled_steady_state for the
+    level the step tests settle at.
+    '''
+    return T_air + np.asarray(Q_CPU, dtype=float) / fin_conductance(vol_air, T_air, t)
+
+
+def sampled_steady_state(Q_CPU, vol_air, T_air, dt=1.0, n=1000, block=4096):
+    '''
+    CPU temperature at the sample times once the step-test response repeats
+    from sample to sample. The step tests restart sim_air with t = 0 every
+    dt seconds, and fin_conductance G(t) is not monotonic in t, so this
+    level differs from steady_state at any fixed t. Over one sample
+    dθ/dt = Q_CPU - G(t) θ is linear, and the periodic θ(0) = θ(dt) is
+    found by quadrature on n points of t, block operating points at a time.
+    '''
+    Q_CPU, vol_air, T_air = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (Q_CPU, vol_air, T_air)))
+    shape = Q_CPU.shape
+    Q_CPU, vol_air, T_air = Q_CPU.ravel(), vol_air.ravel(), T_air.ravel()
+    # G changes on the scale of k_copper * t ~ .001 near t = 0: a quarter
+    # of the points geometrically spaced up to dt/100, the rest linearly
+    t = np.concatenate(([0.0], np.geomspace(1e-6 * dt, 1e-2 * dt, n // 4),
+                        np.linspace(1e-2 * dt, dt, n - n // 4)[1:]))
+    h = np.diff(t)
+    T = np.empty(len(Q_CPU))
+    for a in range(0, len(T), block):
+        b = a + block
+        G = fin_conductance(vol_air[a:b, None], T_air[a:b, None], t)
+        # I(s) = integral of G from 0 to s
+        I = np.concatenate((np.zeros((len(G), 1)), np.cumsum(.5 * (G[:, 1:] + G[:, :-1]) * h, axis=1)), axis=1)
+        decay = np.exp(I - I[:, -1:])
+        inner = (.5 * (decay[:, 1:] + decay[:, :-1]) * h).sum(axis=1)
+        T[a:b] = T_air[a:b] + Q_CPU[a:b] * inner / (1 - np.exp(-I[:, -1]))
+    return T.reshape(shape)
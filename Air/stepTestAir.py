@@ -1,9 +1,9 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 
 from Air.firstPrinciplesAir import sim_air
+from simulation import simulate
+from telemetry import TelemetryWriter, STEP_COLUMNS
 
 Ta = 25 + 273.15  # ambient temperature (deg K)
 fan_max = .01878351  # max volume flow rate of fans (m^3)
@@ -30,18 +30,10 @@ fan[3000:] = .6
 fan = fan * fan_max * 2
 
 initial_values = [Ta]
-temps = np.ones(n+1) * Ta
-# simulate
-for i in range(n):
-    y = odeint(sim_air, initial_values, [0, 1], args=(q[i], fan[i], T_air[i]))
-    initial_values = y[-1]
-    temps[i+1] = initial_values
-
-# save data
-Tcpu = temps
-d = {'Time': time, 'Tcpu': Tcpu, 'Fan': fan, 'Q': q, 'T_air': T_air}
-df = pd.DataFrame.from_dict(data=d)
-df.to_csv('a_Fan_step.csv')
+# simulate; sim_air uses t, so keep the per-sample clock of the original loop
+# the samples are streamed to the CSV as they are computed
+with TelemetryWriter('a_Fan_step.csv', STEP_COLUMNS) as sink:
+    temps = simulate(sim_air, initial_values, time, q, fan, T_air, sample_clock=True, sink=sink)[:, 0]
 
 # plot results
 plt.figure(figsize=(5, 4))
@@ -67,18 +59,10 @@ q[0:] = 0
 q[1800:] = q_max
 
 initial_values = [Ta]
-temps = np.ones(n+1)*Ta
-# simulate
-for i in range(n):
-    y = odeint(sim_air, initial_values, [0, 1], args=(q[i], fan[i], T_air[i]))
-    initial_values = y[-1]
-    temps[i+1] = initial_values
-
-# save data
-Tcpu = temps
-d = {'Time': time, 'Tcpu': Tcpu, 'Fan': fan, 'Q': q, 'T_air': T_air}
-df = pd.DataFrame(data=d)
-df.to_csv('a_q_step.csv')
+# simulate; sim_air uses t, so keep the per-sample clock of the original loop
+# the samples are streamed to the CSV as they are computed
+with TelemetryWriter('a_q_step.csv', STEP_COLUMNS) as sink:
+    temps = simulate(sim_air, initial_values, time, q, fan, T_air, sample_clock=True, sink=sink)[:, 0]
 
 # plot results
 plt.figure(figsize=(5, 4))
@@ -102,18 +86,10 @@ T_air = np.ones(n+1) * (Ta-5)
 T_air[1800:] = (Ta+10)
 
 initial_values = [Ta]
-temps = np.ones(n+1) * Ta
-# simulate
-for i in range(n):
-    y = odeint(sim_air, initial_values, [0, 1], args=(q[i], fan[i], T_air[i]))
-    initial_values = y[-1]
-    temps[i+1] = initial_values
-
-# save data
-Tcpu = temps
-d = {'Time': time, 'Tcpu': Tcpu, 'Fan': fan, 'Q': q, 'T_air': T_air}
-df = pd.DataFrame(data=d)
-df.to_csv('a_Ta_step.csv')
+# simulate; sim_air uses t, so keep the per-sample clock of the original loop
+# the samples are streamed to the CSV as they are computed
+with TelemetryWriter('a_Ta_step.csv', STEP_COLUMNS) as sink:
+    temps = simulate(sim_air, initial_values, time, q, fan, T_air, sample_clock=True, sink=sink)[:, 0]
 
 # plot results
 plt.figure(figsize=(5, 4))
@@ -2,6 +2,7 @@
 import numpy as np
 import waterproperties as wp
 import airproperties as ap
+from thermalnetwork import Capacity, Link, ThermalNetwork
 
 # assuming lumped capacitance on CPU Chip
 
@@ -35,6 +36,85 @@ fan_ca = .120**2  # fan cross sectional area (m^2)
 
 
 # Functions
+def h_liquid(T_liquid):  # liquid convection coefficient (W/ m^2 K)
+    return 3.66 * wp.ltc(T_liquid) / .005
+
+
+def dh_liquid(T_liquid):
+    return 3.66 * wp.dltcdt(T_liquid) / .005
+
+
+def h_air_hx(vol_air, T_air):  # air convection coefficient on the radiator (W/ m^2 K)
+    vel_air = vol_air / (2 * fan_ca)
+    air = ap.props1atm(T_air)
+    Re_air = vel_air * hx_width / air.nu
+    Nu_air = .680 * Re_air**(.5) * air.pr
+    return Nu_air * air.k / hx_width
+
+
+# conductances of the two paths of tempSim as network links
+def g_cpu_liquid(T_liquid, inputs):
+    return 1 / (1 / (h_liquid(T_liquid) * cpu_A * 2.5) + coldPlate_l / (coldPlate_k * cpu_A))
+
+
+def dg_cpu_liquid(T_liquid, inputs, g):
+    return g**2 * dh_liquid(T_liquid) / (h_liquid(T_liquid)**2 * cpu_A * 2.5)
+
+
+def g_liquid_air(T_liquid, inputs):
+    R_air_to_hx = 1 / (h_air_hx(inputs['vol_air'], inputs['T_air']) * hx_A)
+    R_hx = .0005 / (coldPlate_k * hx_A)
+    R_hx_to_liquid = 1 / (h_liquid(T_liquid) * hx_A)
+    return 1 / (R_air_to_hx + R_hx + R_hx_to_liquid)
+
+
+def dg_liquid_air(T_liquid, inputs, g):
+    return g**2 * dh_liquid(T_liquid) / (h_liquid(T_liquid)**2 * hx_A)
+
+
+# tempSim as a thermal network: CPU -- cold plate -- liquid -- radiator -- air
+network = ThermalNetwork(
+    nodes=('cpu', 'liquid'),
+    capacity={'cpu': cpu_m * cpu_cp,
+              'liquid': Capacity(lambda T: liquid_m * wp.lcp(T), lambda T: liquid_m * wp.dlcpdt(T))},
+    links=[Link('cpu', 'liquid', g_cpu_liquid, dg_cpu_liquid, on='liquid'),
+           Link('liquid', 'T_air', g_liquid_air, dg_liquid_air, on='liquid')],
+    sources={'cpu': 'q'},
+    boundaries=('T_air',))
+
+
+def tempSim_network(T, t, q, vol_air, T_air):
+    '''tempSim through the thermal network; T may be a batch of states (batch, 2).'''
+    return network.derivative(T, {'q': q, 'vol_air': vol_air, 'T_air': T_air})
+
+
+def tempSim_jac(T, t, q, vol_air, T_air):
+    '''Analytic Jacobian of tempSim, d(dT/dt)/dT.'''
+    return network.jacobian(T, {'q': q, 'vol_air': vol_air, 'T_air': T_air})
+
+
+def steady_state(q, vol_air, T_air, tol=1e-10, maxiter=50):
+    '''
+    Steady CPU and liquid temperatures (T_cpu, T_liquid) of tempSim for
+    arrays of operating points. The liquid balance q = g(T_l) (T_l - T_air)
+    over the radiator path is solved by vectorized Newton iteration; the
+    CPU then sits q / g_cpu_liquid(T_l) above the liquid.
+    '''
+    q, vol_air, T_air = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (q, vol_air, T_air)))
+    inputs = {'vol_air': vol_air, 'T_air': T_air}
+    T_l = T_air + q / g_liquid_air(T_air, inputs)
+    for _ in range(maxiter):
+        g = g_liquid_air(T_l, inputs)
+        f = g * (T_l - T_air) - q
+        df = dg_liquid_air(T_l, inputs, g) * (T_l - T_air) + g
+        step = f / df
+        T_l = T_l - step
+        if np.all(np.abs(step) <= tol * T_l):
+            break
+    T_cpu = T_l + q / g_cpu_liquid(T_l, inputs)
+    return T_cpu, T_l
+
+
 def tempSim(T, t, q, vol_air, T_air):
     '''
 
@@ -44,9 +124,10 @@ def tempSim(T, t, q, vol_air, T_air):
     # calculate convection constant for air and liquid
     # air
     vel_air = vol_air / (2 * fan_ca)
-    Re_air = vel_air * hx_width / ap.nu1atm(T_air)
-    Nu_air = .680 * Re_air**(.5) * ap.pr1atm(T_air)
-    h_air_hx = Nu_air * ap.vtc(T_air) / hx_width
+    air = ap.props1atm(T_air)
+    Re_air = vel_air * hx_width / air.nu
+    Nu_air = .680 * Re_air**(.5) * air.pr
+    h_air_hx = Nu_air * air.k / hx_width
     # liquid
     h_liquid = 3.66 * wp.ltc(T_liquid)/ .005
 
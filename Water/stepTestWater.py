@@ -1,11 +1,11 @@
 import os
 import sys
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 
 from firstOrderWater import tempSim
+from simulation import simulate
+from telemetry import TelemetryWriter, WATER_COLUMNS
 
 # change cwd to be where file is running
 os.chdir(os.path.dirname(sys.argv[0]))
@@ -35,19 +35,9 @@ fan[3000:] = .57
 fan = fan * fan_max * 2
 
 initial_values = [Ta, Ta]
-temps = np.ones((n+1, 2)) * Ta
-# simulate
-for i in range(n):
-    y = odeint(tempSim, initial_values, [0,1], args=(q[i], fan[i], T_air[i]))
-    initial_values = y[-1]
-    temps[i+1] = initial_values
-
-# save data
-Tcpu = temps[:, 0]
-Tw = temps[:, 1]
-d = {'Time': time, 'Tcpu': Tcpu, 'Tw': Tw, 'Fan': fan, 'Q': q, 'T_air': T_air}
-df = pd.DataFrame.from_dict(data=d)
-df.to_csv('w_Fan_step.csv')
+# simulate, streaming the samples to the CSV as they are computed
+with TelemetryWriter('w_Fan_step.csv', WATER_COLUMNS) as sink:
+    temps = simulate(tempSim, initial_values, time, q, fan, T_air, sink=sink)
 
 # plot results
 plt.figure(figsize=(5, 4))
@@ -74,19 +64,9 @@ q[0:] = 0
 q[1800:] = q_max
 
 initial_values = [Ta, Ta]
-temps = np.zeros((n+1, 2))
-# simulate
-for i in range(n):
-    y = odeint(tempSim, initial_values, [0,1], args=(q[i], fan[i], T_air[i]))
-    initial_values = y[-1]
-    temps[i+1] = initial_values
-
-# save data
-Tcpu = temps[:, 0]
-Tw = temps[:, 1]
-d = {'Time': time, 'Tcpu': Tcpu, 'Tw': Tw, 'Fan': fan, 'Q': q, 'T_air': T_air}
-df = pd.DataFrame(data=d)
-df.to_csv('w_q_step.csv')
+# simulate, streaming the samples to the CSV as they are computed
+with TelemetryWriter('w_q_step.csv', WATER_COLUMNS) as sink:
+    temps = simulate(tempSim, initial_values, time, q, fan, T_air, sink=sink)
 
 # plot results
 plt.figure(figsize=(5, 4))
@@ -111,19 +91,9 @@ T_air = np.ones(n+1) * (Ta-5)
 T_air[1800:] = (Ta+10)
 
 initial_values = [Ta, Ta]
-temps = np.zeros((n+1, 2))
-# simulate
-for i in range(n):
-    y = odeint(tempSim, initial_values, [0,1], args=(q[i], fan[i], T_air[i]))
-    initial_values = y[-1]
-    temps[i+1] = initial_values
-
-# save data
-Tcpu = temps[:, 0]
-Tw = temps[:, 1]
-d = {'Time': time, 'Tcpu': Tcpu, 'Tw': Tw, 'Fan': fan, 'Q': q, 'T_air': T_air}
-df = pd.DataFrame(data=d)
-df.to_csv('w_Ta_step.csv')
+# simulate, streaming the samples to the CSV as they are computed
+with TelemetryWriter('w_Ta_step.csv', WATER_COLUMNS) as sink:
+    temps = simulate(tempSim, initial_values, time, q, fan, T_air, sink=sink)
 
 # plot results
 plt.figure(figsize=(5, 4))
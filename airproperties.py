@@ -69,9 +69,13 @@
 # nu1atm(t)   kinematic viscosity at 1 atm in m**2/s   temperature in K    #
 # alpha1atm(t)thermal diffusivity at 1atm in m**2/s    temperature in K    #
 # pr1atm(t)   Prandtl number at 1 atm                  temperature in K    #
+# props1atm(t) all of the above at 1 atm, evaluated    temperature in K    #
+#             together (fields rho, mu, k, cp, nu,                         #
+#             alpha, pr)                                                   #
 # ======================================================================== #
 
 import numpy as np
+from collections import namedtuple
 from scipy   import interpolate
 
 # critical temperature
@@ -118,11 +122,13 @@ def vvs(t): # viscosity
     y = A*t**B/(1+C/t+D/t**2)
     return y # Pa*s
 
+# density data at 1 atm from Bergman et. al.; the spline is fit once at import
+DT=np.array([100,150,200,250,300,350,400,450,500,550,600,650,700,750,800,850,900,950,1000,1100,1200,1300,1400,1500,1600,1700,1800,1900,2000,2100,2200,2300,2400,2500,3000])
+DR=np.array([3.5562,2.3364,1.7458,1.3947,1.1614,0.9950,0.8711,0.7740,0.6964,0.6329,0.5804,0.5356,0.4975,0.4643,0.4354,0.4097,0.3868,0.3666,0.3482,0.3166,0.2902,0.2679,0.2488,0.2322,0.2177,0.2049,0.1935,0.1833,0.1741,0.1658,0.1582,0.1513,0.1488,0.1389,0.1135])
+rho_tck = interpolate.splrep(DT,DR)
+
 def rho1atm(t): # density at 1 atm
-    DT=np.array([100,150,200,250,300,350,400,450,500,550,600,650,700,750,800,850,900,950,1000,1100,1200,1300,1400,1500,1600,1700,1800,1900,2000,2100,2200,2300,2400,2500,3000])
-    DR=np.array([3.5562,2.3364,1.7458,1.3947,1.1614,0.9950,0.8711,0.7740,0.6964,0.6329,0.5804,0.5356,0.4975,0.4643,0.4354,0.4097,0.3868,0.3666,0.3482,0.3166,0.2902,0.2679,0.2488,0.2322,0.2177,0.2049,0.1935,0.1833,0.1741,0.1658,0.1582,0.1513,0.1488,0.1389,0.1135])
-    tck = interpolate.splrep(DT,DR)
-    y=interpolate.splev(t,tck)
+    y=interpolate.splev(t,rho_tck)
     return y # kg/m^3
 
 def nu1atm(t): # kinetmatic viscosity at 1 atm
@@ -140,3 +146,20 @@ def pr1atm(t): # Prandtl Number
     
 
   
+
+# properties at 1 atm returned together by props1atm; each field has the
+# shape of the temperature input
+Props1atm = namedtuple('Props1atm', ['rho', 'mu', 'k', 'cp', 'nu', 'alpha', 'pr'])
+
+def props1atm(t): # all 1 atm properties, base correlations evaluated once
+    t = np.asarray(t, dtype=float)
+    rho = rho1atm(t) # kg/m^3
+    mu = vvs(t) # Pa*s
+    k = vtc(t) # W/m/K
+    cp = icp(t) # J/mol/K
+    nu = mu/rho # m^2/s
+    alpha = k/rho*mw/cp # m^2/s
+    pr = nu/alpha # unitless
+    if t.ndim == 0:
+        return Props1atm(*(float(p) for p in (rho, mu, k, cp, nu, alpha, pr)))
+    return Props1atm(rho, mu, k, cp, nu, alpha, pr)
@@ -0,0 +1,96 @@
+# ======================================================================== #
+# autotune.py                                                              #
+#                                                                          #
+# IMC auto-tuning of the PID fan controller.  Instead of the three fixed   #
+# tuning styles, the closed-loop time constant tauC (and optionally the    #
+# derivative time tauD) is swept over a continuous range.  Every candidate #
+# is scored with closedloop.simulate_pid on one shared set of disturbance  #
+# scenarios, on a process pool, by                                         #
+#   mse        mean squared setpoint error                                 #
+#   overshoot  peak temperature above the setpoint (K)                     #
+#   effort     mean absolute fan change per sample (% fan)                 #
+# each averaged over the scenarios.  The candidates that no other          #
+# candidate beats on all three scores form the Pareto set.                 #
+# ======================================================================== #
+
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import closedloop
+
+AutotuneResult = namedtuple('AutotuneResult', ['table', 'pareto', 'elapsed'])
+
+SCORES = ('mse', 'overshoot', 'effort')
+
+# scenarios and loop settings shared with the pool workers
+_shared = None
+
+
+def _init_worker(shared):
+    global _shared
+    _shared = shared
+
+
+def score(Kc, tauI, tauD):
+    '''mse, overshoot and effort of one PID setting over the shared scenarios.'''
+    q_cpu, T_ambient, sp, kwargs = _shared
+    window = kwargs.get('window', (40, -2))
+    result = closedloop.simulate_pid(q_cpu, T_ambient, sp, Kc, tauI, tauD, **kwargs)
+    j, k = window
+    sp = np.broadcast_to(sp, result.T_cpu.shape)
+    overshoot = np.max(result.T_cpu[:, j:k] - sp[:, j:k], axis=1).clip(min=0)
+    effort = np.abs(np.diff(result.u[:, j:k], axis=1)).mean(axis=1)
+    return result.mse.mean(), overshoot.mean(), effort.mean()
+
+
+def _score(setting):
+    return score(*setting)
+
+
+def pareto_front(scores):
+    '''Boolean mask of the rows of scores (to be minimized) that are not dominated.'''
+    scores = np.asarray(scores)
+    front = np.ones(len(scores), dtype=bool)
+    for i, s in enumerate(scores):
+        dominated = np.all(scores <= s, axis=1) & np.any(scores < s, axis=1)
+        front[i] = not dominated.any()
+    return front
+
+
+def autotune(Kp, taup, thetap, q_cpu, T_ambient, sp, tauC, tauD=(0,), processes=None, **kwargs):
+    '''
+    Score every (tauC, tauD) pair on the disturbance scenarios q_cpu and
+    T_ambient, shape (N, steps). Kc and tauI follow from the IMC rules for
+    the FOPDT model (Kp, taup, thetap); kwargs go to
+    closedloop.simulate_pid (plant, dt, op_lo, ...). processes=1 scores in
+    this process.
+
+    Returns the table of all candidates with their scores and a pareto
+    column, the Pareto-best rows, and the search wall time in seconds.
+    '''
+    start = time.perf_counter()
+    q_cpu, T_ambient = np.atleast_2d(np.asarray(q_cpu, dtype=float), np.asarray(T_ambient, dtype=float))
+    rows = []
+    for c in np.atleast_1d(tauC):
+        for d in np.atleast_1d(tauD):
+            Kc, tauI = closedloop.imc_pi(Kp, taup, thetap, c)
+            rows.append({'tauC': c, 'tauD': d, 'Kc': Kc, 'tauI': tauI})
+    settings = [(r['Kc'], r['tauI'], r['tauD']) for r in rows]
+
+    shared = (q_cpu, T_ambient, np.asarray(sp, dtype=float), kwargs)
+    if processes == 1:
+        _init_worker(shared)
+        scores = list(map(_score, settings))
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(shared,)) as pool:
+            scores = list(pool.map(_score, settings))
+
+    table = pd.DataFrame(rows)
+    table[list(SCORES)] = np.array(scores)
+    table['pareto'] = pareto_front(table[list(SCORES)].to_numpy())
+    pareto = table[table['pareto']].sort_values('mse').reset_index(drop=True)
+    return AutotuneResult(table, pareto, time.perf_counter() - start)
@@ -0,0 +1,25 @@
+# Scaling of controlservice.ControlService with the number of simulated
+# zones: completed steps per second and overruns, all in one thread.
+# Run from the repository root:  python -m benchmarks.benchControlService
+import asyncio
+
+import closedloop
+import controlservice
+import pidcontroller
+
+Kc, tauI, tauD = closedloop.imc_tuning(-.15, .24, .92)
+period = .05
+duration = 3
+
+for zones in (10, 100, 500, 1000):
+    service = controlservice.ControlService(speed=20)
+    for i in range(zones):
+        service.add_simulated_zone(f'cpu{i}', pidcontroller.PIDController(Kc, tauI, tauD),
+                                   273.15 + 60, period, delay=.001)
+    stats = asyncio.run(service.run(duration))
+    steps = sum(s['iterations'] for s in stats.values())
+    overruns = sum(s['overruns'] for s in stats.values())
+    latency = max(s['latency_max'] for s in stats.values())
+    jitter = max(s['jitter_max'] for s in stats.values())
+    print(f'{zones} zones: {steps / duration:,.0f} steps/s of {zones / period:,.0f} scheduled, '
+          f'{overruns} overruns, max latency {latency * 1e3:.1f} ms, max jitter {jitter * 1e3:.1f} ms')
@@ -0,0 +1,64 @@
+# Cost and agreement of the exact FOPDT simulation against the original
+# per-sample odeint loop on the fan step tests, and fitting cost with the
+# exact SSE gradient.
+# Run from the repository root:  python -m benchmarks.benchFOPDT
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+import fopdt
+
+cases = [('Air/a_Fan_step.csv', 60, [-801.4, .24, 1]),
+         ('Water/w_Fan_step.csv', 700, [-532, 20.5, 0]),
+         ('Water/w_Fan_step.csv', 700, [-2632, 148.5, 13.3])]
+
+print(f'{"data":<22}{"x":<24}{"odeint (s)":>11}{"exact (ms)":>12}{"speedup":>9}{"max |diff| (K)":>16}')
+for path, tsleep, x in cases:
+    data = pd.read_csv(path, index_col=0)
+    t = data['Time'].to_numpy()[tsleep:]
+    u = data['Fan'].to_numpy()[tsleep:]
+    y = data['Tcpu'].to_numpy()[tsleep:]
+
+    start = time.perf_counter()
+    y_odeint = fopdt.simulate_odeint(x, t, u, y[0])
+    t_odeint = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(100):
+        y_exact = fopdt.simulate(x, t, u, y[0])
+    t_exact = (time.perf_counter() - start) / 100
+
+    print(f'{path:<22}{str(x):<24}{t_odeint:>11.3f}{t_exact * 1e3:>12.3f}'
+          f'{t_odeint / t_exact:>8.0f}x{np.max(np.abs(y_exact - y_odeint)):>16.2e}')
+
+# exact gradient against central differences, away from integer thetam
+# where the response has a kink
+print(f'\n{"data":<22}{"x":<24}{"max |grad - fd| / max |grad|":>30}')
+for path, tsleep, x0 in cases:
+    data = pd.read_csv(path, index_col=0)
+    t = data['Time'].to_numpy()[tsleep:]
+    u = data['Fan'].to_numpy()[tsleep:]
+    y = data['Tcpu'].to_numpy()[tsleep:]
+    x = np.array(x0, dtype=float) + [0, 0, .37]
+    f, grad = fopdt.sse_grad(x, t, u, y)
+    fd = np.zeros(3)
+    for k in range(3):
+        step = np.zeros(3)
+        step[k] = 1e-6 * max(abs(x[k]), 1e-3)
+        fd[k] = (fopdt.sse(x + step, t, u, y) - fopdt.sse(x - step, t, u, y)) / (2 * step[k])
+    print(f'{path:<22}{str(x.round(3).tolist()):<24}{np.max(np.abs(grad - fd)) / np.max(np.abs(grad)):>30.2e}')
+
+# fitting with a finite-difference gradient against the exact gradient
+print(f'\n{"data":<22}{"gradient":<13}{"SSE":>12}{"nit":>6}{"nfev":>6}{"time (ms)":>11}')
+for path, tsleep, x0 in cases[:2]:
+    data = pd.read_csv(path, index_col=0)
+    t = data['Time'].to_numpy()[tsleep:]
+    u = data['Fan'].to_numpy()[tsleep:]
+    y = data['Tcpu'].to_numpy()[tsleep:]
+    with np.errstate(all='ignore'):
+        for name, func, jac in [('finite diff', fopdt.sse, None), ('exact', fopdt.sse_grad, True)]:
+            start = time.perf_counter()
+            sol = minimize(func, x0, args=(t, u, y), jac=jac)
+            elapsed = time.perf_counter() - start
+            print(f'{path:<22}{name:<13}{sol.fun:>12.2f}{sol.nit:>6}{sol.nfev:>6}{elapsed * 1e3:>11.1f}')
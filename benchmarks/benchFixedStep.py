@@ -0,0 +1,114 @@
+# Fixed-step integrators of fixedstep.py: error against odeint on the
+# step tests (odeint with the simulate defaults, as the step-test scripts
+# run it) and the per-step latency of every stepper, with the worst case.
+# Run from the repository root:  python -m benchmarks.benchFixedStep
+import gc
+import sys
+import time
+
+import numpy as np
+
+import fopdt
+import kernels
+import simulation
+from fixedstep import FOPDTStepper, stepper
+from Air.firstPrinciplesAir import sim_air, sim_air_jac
+
+sys.path.insert(0, 'Water')
+from firstOrderWater import tempSim, tempSim_jac, fan_max  # noqa: E402
+
+Ta = 25 + 273.15
+n = 3600
+t = np.linspace(0, n, n+1)
+
+
+def steps(values):
+    # fan fractions of the fan step tests, changing every 300 s from 1
+    fan = np.ones(n+1)
+    for i, f in zip(range(300, 3001, 300), values):
+        fan[i:] = f
+    return fan * fan_max * 2
+
+
+q_step = np.zeros(n+1)
+q_step[1800:] = 105
+Ta_step = np.ones(n+1) * (Ta - 5)
+Ta_step[1800:] = Ta + 10
+tests = [
+    ('water fan step', tempSim, tempSim_jac, [Ta, Ta], {},
+     (np.ones(n+1) * 100, steps((.03, .09, .15, .21, .27, .33, .39, .45, .51, .57)), np.ones(n+1) * Ta)),
+    ('water q step', tempSim, tempSim_jac, [Ta, Ta], {},
+     (q_step, np.ones(n+1) * fan_max * .8 * 2, np.ones(n+1) * Ta)),
+    ('water Ta step', tempSim, tempSim_jac, [Ta, Ta], {},
+     (np.ones(n+1) * .8 * 105, np.ones(n+1) * fan_max * .8 * 2, Ta_step)),
+    ('air fan step', sim_air, sim_air_jac, [Ta], {'sample_clock': True},
+     (np.ones(n+1) * 100, steps((.75, .55, .85, .65, .6, .7, .8, .9, .95, .6)), np.ones(n+1) * Ta)),
+]
+
+print('error against odeint')
+print(f'{"test":<16}{"solver":<10}{"substeps":>9}{"time (s)":>10}{"max err (K)":>13}')
+for name, model, jac, y0, kw, (q, fan, T_air) in tests:
+    start = time.perf_counter()
+    reference = simulation.simulate(model, y0, t, q, fan, T_air, **kw)
+    print(f'{name:<16}{"odeint":<10}{"":>9}{time.perf_counter() - start:>10.3f}')
+    for solver in ('rk4', 'expeuler'):
+        for substeps in (1, 4, 16):
+            start = time.perf_counter()
+            states = simulation.simulate(model, y0, t, q, fan, T_air, solver=solver, jac=jac,
+                                         substeps=substeps, **kw)
+            elapsed = time.perf_counter() - start
+            print(f'{"":<16}{solver:<10}{substeps:>9}{elapsed:>10.3f}'
+                  f'{np.max(np.abs(states - reference)):>13.2e}')
+
+# FOPDT: the linear hold reproduces fopdt.simulate, the held input is causal
+# for any dead time and lags it by the input ramp of one sample
+x = [.35, 45.0, 3.4]
+u = np.ones(n+1) * 20
+u[600:] = 80
+u[2400:] = 50
+reference = fopdt.simulate(x, t, u, Ta)
+for hold in ('linear', 'zoh'):
+    s = FOPDTStepper(*x, 1.0, Ta, u[0], hold)
+    y = np.empty(n+1)
+    y[0] = Ta
+    for i in range(n):
+        y[i+1] = s.update(u[i])
+    print(f'FOPDT {hold:<6} hold: max difference from fopdt.simulate {np.max(np.abs(y - reference)):.2e} K')
+
+
+def latency(step, count=20000):
+    '''Per-step times in microseconds, with the garbage collector paused.'''
+    out = np.empty(count)
+    clock = time.perf_counter_ns
+    gc.disable()
+    try:
+        for i in range(count):
+            start = clock()
+            step(i)
+            out[i] = clock() - start
+    finally:
+        gc.enable()
+    return out / 1000
+
+
+args = (100.0, fan_max * .8 * 2, Ta)
+cases = []
+for name, model, jac, y0 in (('tempSim', tempSim, tempSim_jac, [330.0, 310.0]),
+                             ('kernels.tempSim', kernels.tempSim, tempSim_jac, [330.0, 310.0]),
+                             ('sim_air', sim_air, sim_air_jac, [330.0]),
+                             ('kernels.sim_air', kernels.sim_air, sim_air_jac, [330.0])):
+    for method in ('rk4', 'expeuler'):
+        s = stepper(model, y0, .25, method, jac)
+        cases.append((f'{name} {method}', lambda i, s=s: s.step(.25 * (i % 4), args)))
+for hold in ('zoh', 'linear'):
+    s = FOPDTStepper(*x, 1.0, Ta, 20.0, hold)
+    cases.append((f'FOPDT {hold}', lambda i, s=s: s.update(20.0 if i % 600 < 300 else 80.0)))
+
+print()
+print(f'per-step latency (us, kernels backend: {kernels.BACKEND})')
+print(f'{"stepper":<26}{"median":>9}{"p99":>9}{"p99.9":>9}{"worst":>9}')
+for name, step in cases:
+    step(0)  # warm up
+    lat = latency(step)
+    print(f'{name:<26}{np.median(lat):>9.2f}{np.percentile(lat, 99):>9.2f}'
+          f'{np.percentile(lat, 99.9):>9.2f}{lat.max():>9.2f}')
@@ -0,0 +1,56 @@
+# Per-call cost of the kernels.py right-hand sides against the model
+# functions, and wall time of the air fan step test (per-sample odeint
+# restarts) and the water fan step test with each.
+# Run from the repository root:  python -m benchmarks.benchKernels
+import sys
+import time
+
+import numpy as np
+
+import kernels
+import simulation
+from Air.firstPrinciplesAir import sim_air
+
+sys.path.insert(0, 'Water')
+from firstOrderWater import tempSim, fan_max  # noqa: E402
+
+print(f'kernels backend: {kernels.BACKEND}')
+start = time.perf_counter()
+kernels.sim_air(np.array([300.0]), 0.0, 100.0, .03, 298.15)
+kernels.tempSim(np.array([300.0, 300.0]), 0.0, 100.0, .03, 298.15)
+print(f'first calls (compile or load from cache): {time.perf_counter() - start:.3f} s')
+
+
+def per_call(f, y, repeat=20000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        f(y, .5, 100.0, .03, 298.15)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+for name, model, kernel, y in (('sim_air', sim_air, kernels.sim_air, np.array([330.0])),
+                               ('tempSim', tempSim, kernels.tempSim, np.array([330.0, 310.0]))):
+    err = np.max(np.abs(model(y, .5, 100.0, .03, 298.15) - kernel(y, .5, 100.0, .03, 298.15)))
+    a, b = per_call(model, y), per_call(kernel, y)
+    print(f'{name}: model {a:.2f} us/call, kernel {b:.2f} us/call ({a / b:.1f}x), max difference {err:.1e}')
+
+Ta = 25 + 273.15
+n = 3600
+t = np.linspace(0, n, n+1)
+T_air = np.ones(n+1) * Ta
+q = np.ones(n+1) * 100
+fan = np.ones(n+1)
+for i, f in zip(range(300, 3001, 300), (.75, .55, .85, .65, .6, .7, .8, .9, .95, .6)):
+    fan[i:] = f
+fan = fan * fan_max * 2
+
+for name, model, kernel, y0, kw in (('air fan step', sim_air, kernels.sim_air, [Ta], {'sample_clock': True}),
+                                    ('water fan step', tempSim, kernels.tempSim, [Ta, Ta], {})):
+    times = []
+    results = []
+    for f in (model, kernel):
+        start = time.perf_counter()
+        results.append(simulation.simulate(f, y0, t, q, fan, T_air, **kw))
+        times.append(time.perf_counter() - start)
+    print(f'{name}: model {times[0]:.2f} s, kernel {times[1]:.2f} s ({times[0] / times[1]:.1f}x), '
+          f'max difference {np.max(np.abs(results[0] - results[1])):.1e} K')
@@ -0,0 +1,46 @@
+# Per-update cost and memory of pidcontroller.PIDController, checked against
+# the batched loop in closedloop.simulate_pid.
+# Run from the repository root:  python -m benchmarks.benchPIDController
+import time
+import tracemalloc
+
+import numpy as np
+
+import closedloop
+import disturbances
+import pidcontroller
+
+n = 3600
+sp = np.ones(n+1) * (273.15 + 60)
+q_cpu = disturbances.bounded_random_walk(n+1, 1, 5, 10, 105, seed=0)
+T_ambient = disturbances.bounded_random_walk(n+1, 273.15 + 25, 1, 273.15 + 15, 273.15 + 32, seed=1)
+Kc, tauI, tauD = closedloop.imc_tuning(-.15, .24, .92)
+reference = closedloop.simulate_pid(q_cpu, T_ambient, sp, Kc, tauI, tauD)
+
+# same loop driven one sample at a time
+pid = pidcontroller.PIDController(Kc, tauI, tauD, u0=100, history=600)
+T_cpu = np.full(n+1, 300.0)
+u = np.full(n+1, 100.0)
+for i in range(1, n - 1):
+    u[i] = pid.update(T_cpu[i], sp[i], 1.0)
+    T_cpu[i+1] = closedloop.plant_step(closedloop.AIR_PLANT, T_cpu[i], u[i], q_cpu[i], T_ambient[i], 1.0)
+err = max(np.max(np.abs(T_cpu - reference.T_cpu)), np.max(np.abs(u - reference.u)))
+assert err < 1e-9, err
+print(f'max difference to closedloop.simulate_pid: {err:.1e}')
+
+updates = 10**6
+for history in (0, 600):
+    pid = pidcontroller.PIDController(Kc, tauI, tauD, history=history)
+    start = time.perf_counter()
+    for _ in range(updates):
+        pid.update(333.0, 333.15, 1.0)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(updates // 10):
+        pid.update(333.0, 333.15, 1.0)
+    growth = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(before, 'filename')
+                 if s.traceback[0].filename.endswith('pidcontroller.py'))
+    tracemalloc.stop()
+    print(f'history={history}: {elapsed / updates * 1e6:.2f} us per update '
+          f'({updates / elapsed:,.0f} updates/s), memory growth {growth} B')
@@ -0,0 +1,36 @@
+# Per-call cost of the spline-backed properties before and after the spline
+# fits were cached at import.
+# Run from the repository root:  python -m benchmarks.benchProperties
+import timeit
+
+import numpy as np
+from scipy import interpolate
+
+import airproperties as ap
+import waterproperties as wp
+
+
+# previous implementations: the spline is refit on every call
+def rho1atm_refit(t):
+    tck = interpolate.splrep(ap.DT, ap.DR)
+    return interpolate.splev(t, tck)
+
+
+def vdnsat_refit(t):
+    tck = interpolate.splrep(wp.tdata, wp.ddata)
+    return 1.0 / interpolate.splev(t, tck)
+
+
+def per_call(func, t, number=2000):
+    return min(timeit.repeat(lambda: func(t), number=number, repeat=5)) / number
+
+
+cases = [('airproperties.rho1atm', rho1atm_refit, ap.rho1atm, 298.15),
+         ('waterproperties.vdnsat', vdnsat_refit, wp.vdnsat, 330.0)]
+
+print(f'{"function":<26}{"refit (us)":>12}{"cached (us)":>13}{"speedup":>9}')
+for name, before, after, t in cases:
+    assert np.isclose(before(t), after(t))
+    t_before = per_call(before, t) * 1e6
+    t_after = per_call(after, t) * 1e6
+    print(f'{name:<26}{t_before:>12.2f}{t_after:>13.2f}{t_before / t_after:>8.1f}x')
@@ -0,0 +1,43 @@
+# Accuracy and lookup cost of the tabulated property backend against the
+# exact correlations.
+# Run from the repository root:  python -m benchmarks.benchPropertyTables
+import time
+import timeit
+
+import numpy as np
+
+import airproperties
+import waterproperties
+import propertytables
+
+
+def per_call(func, t, number):
+    return min(timeit.repeat(lambda: func(t), number=number, repeat=5)) / number
+
+
+start = time.perf_counter()
+libs = [('air', airproperties, propertytables.air()),
+        ('water', waterproperties, propertytables.water())]
+print(f'tables built in {time.perf_counter() - start:.2f} s\n')
+
+# independent check of the error bound on random temperatures in the range
+rng = np.random.default_rng(0)
+T = rng.uniform(propertytables.tmin, propertytables.tmax, 200000)
+T_scalar = 331.7
+
+print(f'{"property":<18}{"nodes":>7}{"max rel err":>13}'
+      f'{"exact (us)":>12}{"table (us)":>12}{"exact 200k (ms)":>17}{"table 200k (ms)":>17}')
+for lib_name, exact_lib, table_lib in libs:
+    for name, table in table_lib.tables.items():
+        exact = getattr(exact_lib, name)
+        err = np.max(np.abs(table(T) - exact(T)) / np.abs(exact(T)))
+        assert err <= propertytables.rtol, f'{lib_name}.{name}: {err}'
+        print(f'{lib_name + "." + name:<18}{table.n + 1:>7}{err:>13.2e}'
+              f'{per_call(exact, T_scalar, 2000) * 1e6:>12.2f}'
+              f'{per_call(table, T_scalar, 2000) * 1e6:>12.2f}'
+              f'{per_call(exact, T, 5) * 1e3:>17.2f}'
+              f'{per_call(table, T, 5) * 1e3:>17.2f}')
+
+air = propertytables.air()
+print(f'\nairproperties.props1atm: exact {per_call(airproperties.props1atm, T_scalar, 2000) * 1e6:.2f} us, '
+      f'table {per_call(air.props1atm, T_scalar, 2000) * 1e6:.2f} us per scalar call')
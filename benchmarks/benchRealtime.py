@@ -0,0 +1,24 @@
+# Real-time loop statistics of realtime.run on the simulated backends:
+# compute latency, release jitter and deadline misses at several periods.
+# Run from the repository root:  python -m benchmarks.benchRealtime
+import numpy as np
+
+import closedloop
+import pidcontroller
+import realtime
+
+Kc, tauI, tauD = closedloop.imc_tuning(-.15, .24, .92)
+sp = 273.15 + 60
+
+for name, backend in (('FOPDT', realtime.SimulatedFOPDT), ('sim_air', realtime.SimulatedODE)):
+    for period in (.1, .01, .001):
+        pid = pidcontroller.PIDController(Kc, tauI, tauD)
+        # plant time 100x faster than the wall clock
+        stats = realtime.run(pid, backend(), sp, period, duration=2, speed=100)
+        print(f'{name}, period {period * 1e3:g} ms, {len(stats.latency)} iterations')
+        print(realtime.summary(stats))
+        h = realtime.histograms(stats)
+        i = np.flatnonzero(h['latency'])
+        print('latency histogram (us): ' + ', '.join(f'{h["bins"][j] * 1e6:.3g}-{h["bins"][j+1] * 1e6:.3g}: '
+                                                   f'{h["latency"][j]}' for j in i))
+        print()
@@ -0,0 +1,60 @@
+# Solver time, model and Jacobian evaluation counts and accuracy for the
+# water-loop step tests, with and without the analytic tempSim Jacobian.
+# The reference is odeint at rtol = atol = 1e-11.
+# Run from the repository root:  python -m benchmarks.benchSolvers
+import sys
+import time
+
+import numpy as np
+
+import simulation
+
+sys.path.insert(0, 'Water')
+from firstOrderWater import tempSim, tempSim_jac, fan_max  # noqa: E402
+
+Ta = 25 + 273.15
+n = 3600
+t = np.linspace(0, n, n+1)
+
+# fan and q step tests of stepTestWater.py
+fan = np.ones(n+1)
+for i, f in zip(range(300, 3001, 300), (.03, .09, .15, .21, .27, .33, .39, .45, .51, .57)):
+    fan[i:] = f
+tests = {'fan step': (np.ones(n+1) * 100, fan * fan_max * 2, np.ones(n+1) * Ta)}
+q = np.zeros(n+1)
+q[1800:] = 105
+tests['q step'] = (q, np.ones(n+1) * fan_max * .8 * 2, np.ones(n+1) * Ta)
+
+
+class Counted:
+    '''Function wrapper counting its calls.'''
+
+    def __init__(self, f):
+        self.f = f
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.f(*args)
+
+
+configs = [('odeint', {}), ('LSODA', {}), ('BDF', {}), ('Radau', {}),
+           ('implicit', {'h': 1.0}), ('implicit', {'h': .25})]
+
+for name, (q_in, fan_in, Ta_in) in tests.items():
+    reference = simulation.simulate(tempSim, [Ta, Ta], t, q_in, fan_in, Ta_in, rtol=1e-11, atol=1e-11)
+    print(name)
+    print(f'{"solver":<16}{"Jacobian":<10}{"time (s)":>9}{"nfev":>8}{"njev":>7}{"max err (K)":>13}')
+    for solver, kw in configs:
+        for use_jac in (False, True):
+            model = Counted(tempSim)
+            jac = Counted(tempSim_jac) if use_jac else None
+            if solver != 'implicit':
+                kw = dict(kw, rtol=1e-6, atol=1e-6)
+            start = time.perf_counter()
+            states = simulation.simulate(model, [Ta, Ta], t, q_in, fan_in, Ta_in, solver=solver, jac=jac, **kw)
+            elapsed = time.perf_counter() - start
+            label = solver + (f' h={kw["h"]:g}' if 'h' in kw else '')
+            print(f'{label:<16}{"analytic" if use_jac else "numeric":<10}{elapsed:>9.3f}{model.calls:>8}'
+                  f'{jac.calls if jac else 0:>7}{np.max(np.abs(states - reference)):>13.2e}')
+    print()
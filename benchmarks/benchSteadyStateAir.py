@@ -0,0 +1,38 @@
+# Steady-state CPU temperature of the air model over a (Q_CPU, fan, T_air)
+# grid: sampled_steady_state and steady_state for the whole grid against
+# integrating sim_air to equilibrium with per-sample restarts as the step
+# tests do, for a subset of the points.
+# Run from the repository root:  python -m benchmarks.benchSteadyStateAir
+import time
+
+import numpy as np
+from scipy.integrate import odeint
+
+import Air.firstPrinciplesAir as fpa
+
+fan_full = fpa.fan_max * 2
+Q, fan, T_air = np.meshgrid(np.linspace(10, 105, 20), np.linspace(.1, 1, 20) * fan_full,
+                            np.linspace(273.15 + 15, 273.15 + 35, 10), indexing='ij')
+
+start = time.perf_counter()
+sampled = fpa.sampled_steady_state(Q, fan, T_air)
+t_sampled = time.perf_counter() - start
+start = time.perf_counter()
+root = fpa.steady_state(Q, fan, T_air)
+t_root = time.perf_counter() - start
+print(f'{Q.size} operating points: sampled_steady_state {t_sampled:.3f} s, steady_state (t=1) {t_root * 1e3:.2f} ms')
+print(f'sampled level minus t=1 root: {np.min(sampled - root):.2f} to {np.max(sampled - root):.2f} K')
+
+# time integration to equilibrium for every 40th point
+idx = np.arange(0, Q.size, 40)
+start = time.perf_counter()
+err = 0.0
+for i in idx:
+    q, f, ta = Q.flat[i], fan.flat[i], T_air.flat[i]
+    y = ta
+    for _ in range(60):  # 60 samples is well past the fin time constant
+        y = odeint(fpa.sim_air, [y], [0, 1], args=(q, f, ta))[-1, 0]
+    err = max(err, abs(y - sampled.flat[i]))
+t_ode = (time.perf_counter() - start) / len(idx)
+print(f'odeint to equilibrium: {t_ode * 1e3:.1f} ms per point ({t_ode * Q.size:.1f} s for the grid), '
+      f'max |odeint - sampled_steady_state| {err:.1e} K')
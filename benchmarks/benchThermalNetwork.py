@@ -0,0 +1,64 @@
+# Cost of the thermal network water model against the scalar tempSim:
+# one state per call, a batch of states per call, the analytic Jacobian
+# against finite differences, and a larger network (two CPUs, cold plate,
+# liquid and radiator nodes).
+# Run from the repository root:  python -m benchmarks.benchThermalNetwork
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, 'Water')
+import firstOrderWater as fow  # noqa: E402
+from thermalnetwork import Capacity, Link, ThermalNetwork  # noqa: E402
+import waterproperties as wp  # noqa: E402
+
+fan = .5 * fow.fan_max * 2
+args = (100, fan, 298.15)
+rng = np.random.default_rng(0)
+states = rng.uniform(300, 360, (10000, 2))
+
+
+def per_call(f, x, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        f(x, 0, *args)
+    return (time.perf_counter() - start) / repeat
+
+
+err = max(np.max(np.abs(fow.tempSim_network(T, 0, *args) - fow.tempSim(T, 0, *args))) for T in states[:1000])
+print(f'max |network - tempSim| over 1000 states: {err:.1e} K/s')
+t_scalar = per_call(fow.tempSim, states[0], 20000)
+t_single = per_call(fow.tempSim_network, states[0], 20000)
+t_batch = per_call(fow.tempSim_network, states, 50) / len(states)
+print(f'tempSim: {t_scalar * 1e6:.1f} us/state, network one state: {t_single * 1e6:.1f} us/state, '
+      f'network batch of {len(states)}: {t_batch * 1e6:.2f} us/state')
+
+J = fow.tempSim_jac(states[0], 0, *args)
+h = 1e-5
+J_fd = np.column_stack([(fow.tempSim(states[0] + h * e, 0, *args) - fow.tempSim(states[0] - h * e, 0, *args)) / (2 * h)
+                        for e in np.eye(2)])
+print(f'max |analytic - finite difference Jacobian|: {np.max(np.abs(J - J_fd)):.1e} 1/s, '
+      f'{per_call(fow.tempSim_jac, states[0], 20000) * 1e6:.1f} us per Jacobian')
+
+# two CPUs on one cold plate, liquid loop and a radiator node
+net = ThermalNetwork(
+    nodes=('cpu0', 'cpu1', 'plate', 'liquid', 'radiator'),
+    capacity={'cpu0': 32, 'cpu1': 32, 'plate': 60, 'radiator': 250,
+              'liquid': Capacity(lambda T: wp.lcp(T), wp.dlcpdt)},
+    links=[Link('cpu0', 'plate', 4.0), Link('cpu1', 'plate', 4.0),
+           Link('plate', 'liquid', fow.g_cpu_liquid, fow.dg_cpu_liquid, on='liquid'),
+           Link('liquid', 'radiator', 20.0),
+           Link('radiator', 'T_air', lambda T, inputs: 2 + 40 * inputs['fan'])],
+    sources={'cpu0': 'q0', 'cpu1': 'q1'}, boundaries=('T_air',))
+inputs = {'q0': 90, 'q1': 60, 'fan': .5, 'T_air': 298.15}
+batch = rng.uniform(300, 360, (10000, 5))
+start = time.perf_counter()
+for _ in range(50):
+    net.derivative(batch, inputs)
+t_batch = (time.perf_counter() - start) / 50 / len(batch)
+start = time.perf_counter()
+for _ in range(20000):
+    net.derivative(batch[0], inputs)
+t_single = (time.perf_counter() - start) / 20000
+print(f'5-node network: one state {t_single * 1e6:.1f} us, batch {t_batch * 1e6:.2f} us/state')
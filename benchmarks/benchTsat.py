@@ -0,0 +1,39 @@
+# Accuracy and throughput of the vectorized waterproperties.tsat against
+# the per-point fsolve implementation.
+# Run from the repository root:  python -m benchmarks.benchTsat
+import time
+import warnings
+
+import numpy as np
+
+import waterproperties as wp
+
+# pressure trace from 1 kPa to 1 MPa
+p = np.logspace(3, 6, 20000)
+
+start = time.perf_counter()
+t_fsolve = np.array([wp.tsat_fsolve(pi) for pi in p])
+time_fsolve = time.perf_counter() - start
+
+start = time.perf_counter()
+t_newton = wp.tsat(p)
+time_newton = time.perf_counter() - start
+
+err = np.max(np.abs(t_newton - t_fsolve))
+assert err < 1e-6, err
+# a 2-D pressure array where one point (p < 0) leaves Newton and falls back to fsolve
+p2 = np.array([[1e5, 2e5], [-1.0, 5e4]])
+with warnings.catch_warnings(), np.errstate(invalid='ignore'):
+    warnings.simplefilter('ignore', RuntimeWarning)
+    t2 = wp.tsat(p2)
+assert t2.shape == p2.shape, t2.shape
+ok = p2 > 0
+assert np.max(np.abs(t2[ok] - [wp.tsat_fsolve(pi) for pi in p2[ok]])) < 1e-6
+
+print(f'{len(p)} pressures from {p[0]:.0f} Pa to {p[-1]:.0f} Pa')
+print(f'max |tsat - tsat_fsolve|: {err:.2e} K')
+print(f'max relative residual |vp(tsat) - p|/p: vectorized {np.max(np.abs(wp.vp(t_newton) - p) / p):.2e}, '
+      f'fsolve {np.max(np.abs(wp.vp(t_fsolve) - p) / p):.2e}')
+print(f'fsolve loop: {time_fsolve:.3f} s ({len(p) / time_fsolve:,.0f} points/s)')
+print(f'vectorized:  {time_newton:.4f} s ({len(p) / time_newton:,.0f} points/s), '
+      f'{time_fsolve / time_newton:.0f}x faster')
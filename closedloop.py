@@ -0,0 +1,113 @@
+# ======================================================================== #
+# closedloop.py                                                            #
+#                                                                          #
+# Batched closed-loop simulation of the PID fan controller on the FOPDT    #
+# plant models from Air/PIDair_Tuning.py and Water/PID_water.py.          #
+# N independent disturbance realizations of q_cpu and T_ambient, arrays   #
+# of shape (N, steps), are simulated together: the PID law, anti-reset     #
+# windup and the +/-30 % per-step rate limit are applied element-wise,     #
+# and the plant is advanced with its exact solution for inputs held over   #
+# a sample.  The result includes the MSE of every realization.            #
+#                                                                          #
+# Plant model, with D the disturbance effect of q_cpu and T_ambient:      #
+#   dT/dt = (-(T - Tss) + Kp * (u - uss))/taup + D                         #
+#   D = (q - q_ss) * q_gain + (Ta - Ta_ss) * Ta_gain                       #
+# ======================================================================== #
+
+from collections import namedtuple
+
+import numpy as np
+
+FOPDTPlant = namedtuple('FOPDTPlant', ['Kp', 'taup', 'Tss', 'uss', 'q_ss', 'q_gain', 'Ta_ss', 'Ta_gain'])
+
+# plant models of the PID tuning scripts
+AIR_PLANT = FOPDTPlant(Kp=-15/100, taup=.24, Tss=322, uss=100, q_ss=105, q_gain=1/20, Ta_ss=298, Ta_gain=1/3)
+WATER_PLANT = FOPDTPlant(Kp=-.2, taup=6, Tss=360, uss=100, q_ss=105, q_gain=1/20, Ta_ss=298, Ta_gain=1)
+
+ClosedLoopResult = namedtuple('ClosedLoopResult', ['T_cpu', 'u', 'mse'])
+
+
+def imc_pi(Kp, taup, thetap, tauC):
+    '''IMC PI settings (Kc, tauI) for a FOPDT model and closed-loop time constant tauC.'''
+    Kc = (taup + .5 * thetap) / (Kp * (tauC + .5 * thetap))
+    tauI = taup + .5 * thetap
+    return Kc, tauI
+
+
+def imc_tuning(Kp, taup, thetap, style='moderate'):
+    '''
+    IMC PI(D) settings (Kc, tauI, tauD) for a FOPDT model with the
+    aggressive, moderate or conservative closed-loop time constant. Any
+    other style prints a warning and uses moderate, as the tuning scripts
+    did.
+    '''
+    if style.lower() == 'aggressive':
+        tauC = max(.1 * taup, .8 * thetap)
+    elif style.lower() == 'moderate':
+        tauC = max(taup, 8 * thetap)
+    elif style.lower() == 'conservative':
+        tauC = max(10 * taup, 80 * thetap)
+    else:
+        print(f'Tuning Style Parameter must be either "aggressive" "moderate" or "conservative".\n'
+              f'Your value is: {style}'
+              f'Defaulting to Moderate Tuning')
+        tauC = max(taup, 8 * thetap)
+    Kc, tauI = imc_pi(Kp, taup, thetap, tauC)
+    tauD = 0  # Assume 0 unless oscillation is a problem
+    return Kc, tauI, tauD
+
+
+def plant_step(plant, T, u, q, Ta, dt):
+    '''Exact plant temperature after dt with u, q and Ta held constant.'''
+    D = (q - plant.q_ss) * plant.q_gain + (Ta - plant.Ta_ss) * plant.Ta_gain
+    T_inf = plant.Tss + plant.Kp * (u - plant.uss) + plant.taup * D
+    return T_inf + (T - T_inf) * np.exp(-dt / plant.taup)
+
+
+def mse(T_cpu, sp, window=(40, -2)):
+    '''Mean squared setpoint error over the samples window[0]:window[1].'''
+    j, k = window
+    return np.square(T_cpu[..., j:k] - sp[..., j:k]).mean(axis=-1)
+
+
+def simulate_pid(q_cpu, T_ambient, sp, Kc, tauI, tauD=0, plant=AIR_PLANT, dt=1.0,
+                 T0=300, u0=100, op_lo=0, op_hi=100, rate=.3, window=(40, -2)):
+    '''
+    Closed-loop response to the disturbances q_cpu and T_ambient, shape
+    (N, steps) or (steps,), with setpoint sp (scalar, (steps,) or (N, steps)).
+
+    Follows the loop of the tuning scripts: the controller acts at samples
+    1 to steps-3, output changes are limited to rate times the previous
+    output, and the integral is frozen while the output saturates.
+    Returns T_cpu and u with the shape of the disturbances and the MSE of
+    each realization over window.
+    '''
+    q_cpu = np.asarray(q_cpu, dtype=float)
+    T_ambient = np.asarray(T_ambient, dtype=float)
+    single = q_cpu.ndim == 1
+    q_cpu, T_ambient = np.atleast_2d(q_cpu, T_ambient)
+    N, steps = q_cpu.shape
+    sp = np.broadcast_to(np.asarray(sp, dtype=float), (N, steps))
+
+    T_cpu = np.full((N, steps), float(T0))
+    u = np.full((N, steps), float(u0))
+    I = np.zeros(N)
+    for i in range(1, steps - 2):
+        E = sp[:, i] - T_cpu[:, i]
+        P = Kc * E
+        I_new = Kc / tauI * (E * dt) + I
+        D = -Kc * tauD * (T_cpu[:, i] - T_cpu[:, i-1]) / dt
+        ui = P + I_new + D
+        # anti reset windup prevention
+        saturated = (ui > op_hi) | (ui < op_lo)
+        np.clip(ui, op_lo, op_hi, out=ui)
+        I = np.where(saturated, I, I_new)
+        # rate limit relative to the previous output
+        ui = np.minimum(np.maximum(ui, u[:, i-1] * (1 - rate)), u[:, i-1] * (1 + rate))
+        u[:, i] = ui
+        T_cpu[:, i+1] = plant_step(plant, T_cpu[:, i], ui, q_cpu[:, i], T_ambient[:, i], dt)
+
+    errors = mse(T_cpu, sp, window)
+    if single:
+        return ClosedLoopResult(T_cpu[0], u[0], errors[0])
+    return ClosedLoopResult(T_cpu, u, errors)
@@ -0,0 +1,165 @@
+# ======================================================================== #
+# controlservice.py                                                        #
+#                                                                          #
+# asyncio service hosting many independent fan control loops (zones) in   #
+# one process and one thread, e.g. every CPU and liquid loop of a chassis. #
+# Each zone has its own PIDController, sensor, actuator, setpoint and      #
+# period.  One scheduler task keeps the next release of every zone in a    #
+# heap, sleeps until the earliest one and starts that zone's step as a     #
+# task, so a slow sensor only delays its own zone.  A zone whose previous  #
+# step is still running at its release skips it and counts an overrun.     #
+# A zone whose step raises is stopped and reports the error in its stats;  #
+# the other zones keep running.                                            #
+#                                                                          #
+# Sensors have "async def read()" returning a temperature and actuators    #
+# "async def write(op)" taking the fan output (%).  SimulatedPlant is both #
+# for a realtime.SimulatedFOPDT or SimulatedODE model advanced to the      #
+# service plant time, which runs speed times faster than the wall clock:   #
+# service = controlservice.ControlService(speed=100)                       #
+# for i in range(200):                                                     #
+#     service.add_simulated_zone(f'cpu{i}', PIDController(Kc, tauI),      #
+#                                sp=333.15, period=.01)                    #
+# stats = asyncio.run(service.run(duration=10))                            #
+# ======================================================================== #
+
+import asyncio
+import heapq
+import time
+
+import closedloop
+import realtime
+
+
+class SimulatedPlant:
+    '''
+    Sensor and actuator for a simulated backend (realtime.SimulatedFOPDT or
+    SimulatedODE), advanced to clock() at every access. delay (s) is waited
+    on every read and write to stand in for the I/O time of the hardware.
+    '''
+
+    def __init__(self, backend, clock, delay=0.0):
+        self.backend = backend
+        self.clock = clock
+        self.delay = delay
+        backend.start(clock())
+
+    async def read(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.backend.read(self.clock())
+
+    async def write(self, op):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.backend.write(op, self.clock())
+
+
+class Zone:
+    '''One control loop of the service and its statistics.'''
+
+    __slots__ = ('name', 'controller', 'sensor', 'actuator', 'sp', 'period', 'task', 'last',
+                 'iterations', 'overruns', 'latency_max', 'latency_sum', 'jitter_max', 'pv', 'op',
+                 'error')
+
+    def __init__(self, name, controller, sensor, actuator, sp, period):
+        self.name = name
+        self.controller = controller
+        self.sensor = sensor
+        self.actuator = actuator
+        self.sp = sp
+        self.period = period
+        self.task = None
+        self.last = None
+        self.iterations = 0
+        self.overruns = 0
+        self.latency_max = 0.0
+        self.latency_sum = 0.0
+        self.jitter_max = 0.0
+        self.pv = None
+        self.op = None
+        self.error = None  # exception that stopped the zone
+
+    def stats(self):
+        return {'iterations': self.iterations, 'overruns': self.overruns,
+                'latency_mean': self.latency_sum / self.iterations if self.iterations else None,
+                'latency_max': self.latency_max, 'jitter_max': self.jitter_max,
+                'pv': self.pv, 'op': self.op,
+                'error': None if self.error is None else f'{type(self.error).__name__}: {self.error}'}
+
+
+class ControlService:
+    '''Zones scheduled on one asyncio event loop.'''
+
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self.zones = {}
+        self._t0 = time.monotonic()
+
+    def time(self):
+        '''Plant time (s) since the service was created.'''
+        return (time.monotonic() - self._t0) * self.speed
+
+    def add_zone(self, name, controller, sensor, actuator, sp, period):
+        '''
+        Add a loop run every period seconds (wall time). sp is a setpoint or
+        a function of plant time.
+        '''
+        if name in self.zones:
+            raise ValueError(f'zone {name!r} already exists')
+        zone = Zone(name, controller, sensor, actuator, sp, period)
+        self.zones[name] = zone
+        return zone
+
+    def add_simulated_zone(self, name, controller, sp, period, plant=closedloop.AIR_PLANT, delay=0.0,
+                           **kwargs):
+        '''Add a zone on a realtime.SimulatedFOPDT plant (kwargs: T0, u0, q, Ta).'''
+        sim = SimulatedPlant(realtime.SimulatedFOPDT(plant, **kwargs), self.time, delay)
+        return self.add_zone(name, controller, sim, sim, sp, period)
+
+    async def _step(self, zone, release):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        t = self.time()
+        try:
+            sp = zone.sp(t) if callable(zone.sp) else zone.sp
+            pv = await zone.sensor.read()
+            dt = zone.period * self.speed if zone.last is None else t - zone.last
+            op = zone.controller.update(pv, sp, dt)
+            await zone.actuator.write(op)
+        except Exception as e:
+            # stop this zone only; the scheduler drops it at its next release
+            zone.error = e
+            print(f'zone {zone.name!r} stopped: {type(e).__name__}: {e}')
+            return
+        zone.last = t
+        zone.pv = pv
+        zone.op = op
+        latency = loop.time() - start
+        zone.iterations += 1
+        zone.latency_sum += latency
+        zone.latency_max = max(zone.latency_max, latency)
+        zone.jitter_max = max(zone.jitter_max, start - release)
+
+    async def run(self, duration):
+        '''Run every zone for duration seconds (wall time); returns the statistics of each zone.'''
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        end = start + duration
+        heap = [(start, i, zone) for i, zone in enumerate(self.zones.values())]
+        heapq.heapify(heap)
+        while heap:
+            release, i, zone = heap[0]
+            if release >= end:
+                break
+            # sleep(0) still yields, so steps run even when the scheduler is behind
+            await asyncio.sleep(max(release - loop.time(), 0))
+            heapq.heappop(heap)
+            if zone.error is not None:
+                continue
+            if zone.task is not None and not zone.task.done():
+                zone.overruns += 1
+            else:
+                zone.task = asyncio.create_task(self._step(zone, release))
+            heapq.heappush(heap, (release + zone.period, i, zone))
+        await asyncio.gather(*(z.task for z in self.zones.values() if z.task is not None))
+        return {name: zone.stats() for name, zone in self.zones.items()}
@@ -0,0 +1,114 @@
+# ======================================================================== #
+# disturbances.py                                                          #
+#                                                                          #
+# Disturbance and input profiles for the simulators, generated as whole    #
+# arrays.  Every generator returns shape (steps,), or (size, steps) for    #
+# size independent realizations, which is the layout closedloop and        #
+# simulation take.  Random profiles are reproducible from seed (an int or  #
+# a numpy Generator).                                                      #
+#                                                                          #
+# The bounded random walks are a sequential recurrence: every step is      #
+# clipped before the next one is added, so they cannot be computed as one  #
+# whole-array operation.  The increments are drawn as arrays; the clipped  #
+# sum is then a python loop over plain floats for one realization, and a   #
+# loop over time with in-place numpy operations across the realizations    #
+# of a batch.  Everything else is whole-array.                             #
+#                                                                          #
+# Function                        Profile                                  #
+# ------------------------------  ---------------------------------------  #
+# bounded_random_walk(...)        x[i] = clip(x[i-1] + U(-step, step),     #
+#                                 lo, hi), as built in the PID scripts     #
+# random_walk_chunks(...)         the same walk generated chunk by chunk   #
+#                                 for very long horizons                   #
+# step_schedule(...)              piecewise-constant steps at given        #
+#                                 sample indices                           #
+# replay(...)                     a recorded trace, repeated to length     #
+#                                 and shifted per realization              #
+# ======================================================================== #
+
+import numpy as np
+import pandas as pd
+
+
+def _rng(seed):
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+
+def random_walk_chunks(steps, x0, step, lo, hi, size=None, seed=None, chunk=65536):
+    '''
+    Bounded random walk of length steps yielded in blocks of at most chunk
+    samples (axis -1). The increments are drawn time-major, so the walk does
+    not depend on chunk: concatenating the blocks gives bounded_random_walk.
+    The clipping makes every sample depend on the previous one, so the walk
+    is a loop over time (see the module header).
+    '''
+    rng = _rng(seed)
+    n = 1 if size is None else size
+    x = np.full(n, float(x0))
+    first = True
+    remaining = steps
+    while remaining > 0:
+        m = min(chunk, remaining)
+        block = np.empty((m, n))
+        start = 0
+        if first:
+            block[0] = x
+            start = 1
+            first = False
+        dx = rng.uniform(-step, step, (m - start, n))
+        if size is None:
+            # one realization: python floats, much cheaper than three ufunc
+            # calls on a one-element array every step
+            xi = float(x[0])
+            walk = []
+            for d in dx[:, 0].tolist():
+                xi = max(min(xi + d, hi), lo)
+                walk.append(xi)
+            block[start:, 0] = walk
+            x[0] = xi
+        else:
+            for i in range(start, m):
+                np.add(x, dx[i - start], out=x)
+                np.minimum(x, hi, out=x)
+                np.maximum(x, lo, out=x)
+                block[i] = x
+        remaining -= m
+        yield block[:, 0] if size is None else block.T
+
+
+def bounded_random_walk(steps, x0, step, lo, hi, size=None, seed=None):
+    '''
+    Random walk starting at x0 with uniform steps in [-step, step], clipped
+    to [lo, hi] after every step. The start value is not clipped.
+    '''
+    if steps == 0:
+        return np.empty((0,) if size is None else (size, 0))
+    return np.concatenate(list(random_walk_chunks(steps, x0, step, lo, hi, size, seed, chunk=steps)),
+                          axis=-1)
+
+
+def step_schedule(steps, initial, changes, size=None):
+    '''
+    Piecewise-constant profile starting at initial, where changes maps a
+    sample index to the value from that sample on, like fan[300:] = .75.
+    '''
+    x = np.full(steps, float(initial))
+    for i, value in sorted(changes.items()):
+        x[i:] = value
+    return x if size is None else np.tile(x, (size, 1))
+
+
+def replay(trace, steps, size=None, seed=None, column=None):
+    '''
+    Recorded trace (an array or a step-test CSV with column) repeated to
+    length steps. With size, every realization starts at a random offset
+    into the trace.
+    '''
+    if isinstance(trace, str):
+        trace = pd.read_csv(trace, index_col=0)[column].to_numpy()
+    trace = np.asarray(trace, dtype=float)
+    if size is None:
+        return np.resize(trace, steps)
+    offsets = _rng(seed).integers(0, len(trace), size)
+    idx = (offsets[:, None] + np.arange(steps)) % len(trace)
+    return trace[idx]
@@ -0,0 +1,190 @@
+# ======================================================================== #
+# fixedstep.py                                                             #
+#                                                                          #
+# Fixed-step plant updates for hardware-in-the-loop emulation, where every #
+# step must take a bounded, repeatable amount of work.  The steppers keep  #
+# their state and stage vectors in buffers allocated once and update the   #
+# state in place.                                                          #
+#                                                                          #
+# RK4Stepper       classical fourth-order Runge-Kutta, four model calls    #
+# ExpEulerStepper  exponential Euler, y += h phi1(h J) f(y): one model and #
+#                  one Jacobian call; exact for linear models and stable   #
+#                  for any step on stiff decaying modes                    #
+# FOPDTStepper     exact update of the fopdt.py model for held (zoh) or    #
+#                  linearly interpolated inputs, the dead time kept in a   #
+#                  ring buffer of past inputs                              #
+#                                                                          #
+# integrate() runs a stepper over output times for simulation.simulate     #
+# (solver='rk4' or 'expeuler', substeps per sample).                       #
+# ======================================================================== #
+
+import math
+
+import numpy as np
+from scipy.linalg import expm
+
+import fopdt
+
+METHODS = ('rk4', 'expeuler')
+
+
+class RK4Stepper:
+    '''RK4 steps of length h for y' = model(y, t, *args), state in self.y.'''
+
+    __slots__ = ('model', 'h', 'y', '_k', '_tmp')
+
+    def __init__(self, model, y0, h):
+        self.model = model
+        self.h = float(h)
+        self.y = np.array(y0, dtype=float, ndmin=1)
+        self._k = np.empty((4, len(self.y)))
+        self._tmp = np.empty(len(self.y))
+
+    def step(self, t, args=()):
+        '''Advance self.y from t to t + h in place and return it.'''
+        model, h, y, k, tmp = self.model, self.h, self.y, self._k, self._tmp
+        k[0] = model(y, t, *args)
+        np.multiply(k[0], h / 2, out=tmp)
+        tmp += y
+        k[1] = model(tmp, t + h / 2, *args)
+        np.multiply(k[1], h / 2, out=tmp)
+        tmp += y
+        k[2] = model(tmp, t + h / 2, *args)
+        np.multiply(k[2], h, out=tmp)
+        tmp += y
+        k[3] = model(tmp, t + h, *args)
+        # y += h/6 (k1 + 2 k2 + 2 k3 + k4)
+        k[1] += k[2]
+        k[1] *= 2
+        k[1] += k[0]
+        k[1] += k[3]
+        k[1] *= h / 6
+        y += k[1]
+        return y
+
+
+class ExpEulerStepper:
+    '''
+    Exponential Euler steps of length h for y' = model(y, t, *args) with
+    Jacobian jac(y, t, *args), state in self.y. phi1(hJ) comes from the
+    closed form for one state and from the matrix exponential of
+    [[hJ, I], [0, 0]] otherwise.
+    '''
+
+    __slots__ = ('model', 'jac', 'h', 'y', '_f', '_aug')
+
+    def __init__(self, model, jac, y0, h):
+        self.model = model
+        self.jac = jac
+        self.h = float(h)
+        self.y = np.array(y0, dtype=float, ndmin=1)
+        n = len(self.y)
+        self._f = np.empty(n)
+        self._aug = np.zeros((2 * n, 2 * n))
+        self._aug[:n, n:] = np.eye(n)
+
+    def step(self, t, args=()):
+        '''Advance self.y from t to t + h in place and return it.'''
+        h, y, f = self.h, self.y, self._f
+        f[:] = self.model(y, t, *args)
+        J = self.jac(y, t, *args)
+        n = len(y)
+        if n == 1:
+            z = h * float(np.reshape(J, -1)[0])
+            phi = 1 + z / 2 + z * z / 6 if abs(z) < 1e-6 else math.expm1(z) / z
+            y += h * phi * f
+            return y
+        self._aug[:n, :n] = J
+        self._aug[:n, :n] *= h
+        phi = expm(self._aug)[:n, n:]
+        y += h * (phi @ f)
+        return y
+
+
+def stepper(model, y0, h, method='rk4', jac=None):
+    '''RK4Stepper or ExpEulerStepper (which needs jac) for method.'''
+    if method == 'rk4':
+        return RK4Stepper(model, y0, h)
+    if method == 'expeuler':
+        if jac is None:
+            raise ValueError('expeuler needs the model Jacobian jac')
+        return ExpEulerStepper(model, jac, y0, h)
+    raise ValueError(f'method must be one of {METHODS}, got {method!r}')
+
+
+def integrate(model, y0, t, args=(), method='rk4', jac=None, substeps=1):
+    '''States at the times t, taking substeps equal fixed steps per interval.'''
+    t = np.asarray(t, dtype=float)
+    out = np.empty((len(t), np.size(y0)))
+    out[0] = y0
+    s = stepper(model, y0, 1.0, method, jac)
+    for i in range(len(t) - 1):
+        s.h = (t[i+1] - t[i]) / substeps
+        tk = t[i]
+        for _ in range(substeps):
+            s.step(tk, args)
+            tk += s.h
+        out[i+1] = s.y
+    return out
+
+
+class FOPDTStepper:
+    '''
+    Exact fixed-step update of the FOPDT model of fopdt.py,
+        taum * dy/dt = -(y - y0) + Km * (u(t - thetam) - u0),
+    one update per sample of length h. hold='zoh' holds every input for
+    its sample (causal for any thetam); hold='linear' interpolates the
+    samples as fopdt.simulate does, which needs thetam >= h so the input
+    after the dead time is already known. Past inputs start at u0.
+    '''
+
+    __slots__ = ('y', 'y0', 'u0', 'Km', 'hold', '_d', '_coef', '_buf', '_i')
+
+    def __init__(self, Km, taum, thetam, h, y0, u0, hold='zoh'):
+        if hold not in ('zoh', 'linear'):
+            raise ValueError(f"hold must be 'zoh' or 'linear', got {hold!r}")
+        if thetam < 0 or (hold == 'linear' and thetam < h):
+            raise ValueError(f'thetam = {thetam} is too short for {hold} hold with h = {h}')
+        self.y = float(y0)
+        self.y0 = float(y0)
+        self.u0 = float(u0)
+        self.Km = float(Km)
+        self.hold = hold
+        # dead time as d whole samples plus the fraction f of one
+        d = int(math.floor(thetam / h + 1e-12))
+        f = thetam / h - d
+        self._d = d
+        a1, c1, _ = fopdt._ramp(f * h, taum)
+        a2, c2, _ = fopdt._ramp((1 - f) * h, taum)
+        self._coef = (float(a1), float(c1), float(a2), float(c2), f)
+        self._buf = [float(u0)] * (d + 3)  # u[k], u[k-1], ... as a ring
+        self._i = 0
+
+    def _past(self, m):
+        # input m samples before the newest one
+        return self._buf[(self._i - m) % len(self._buf)]
+
+    def update(self, u):
+        '''Apply input u at the current sample and return y one sample later.'''
+        self._i = (self._i + 1) % len(self._buf)
+        self._buf[self._i] = float(u)
+        a1, c1, a2, c2, f = self._coef
+        d = self._d
+        Km, u0 = self.Km, self.u0
+        x = self.y - self.y0
+        if self.hold == 'zoh':
+            # delayed input: u[k-d-1] for the first f of the sample, then u[k-d]
+            v1 = Km * (self._past(d + 1) - u0)
+            v2 = Km * (self._past(d) - u0)
+            x = a1 * x + v1 * (1 - a1)
+            x = a2 * x + v2 * (1 - a2)
+        else:
+            # ramps from u(k-d-f) to u[k-d], then on towards u(k-d+1-f)
+            ua, ub, uc = self._past(d + 1), self._past(d), self._past(d - 1)
+            va = Km * (ub - f * (ub - ua) - u0)
+            vb = Km * (ub - u0)
+            vc = Km * (ub + (1 - f) * (uc - ub) - u0)
+            x = a1 * x + va * (1 - a1) + (vb - va) * c1
+            x = a2 * x + vb * (1 - a2) + (vc - vb) * c2
+        self.y = self.y0 + x
+        return self.y
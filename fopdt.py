@@ -0,0 +1,177 @@
+# ======================================================================== #
+# fopdt.py                                                                 #
+#                                                                          #
+# First-order plus dead-time (FOPDT) model used by the step-test fits      #
+#     taum * dy/dt = -(y - y0) + Km * (u(t - thetam) - u0)                 #
+# The input is the linear interpolation of the sampled u, held at u0      #
+# outside the data, as in the original interp1d/odeint fit scripts.        #
+#                                                                          #
+# With a piecewise-linear input the model has an exact discrete-time       #
+# solution.  On a uniform grid every delayed-input breakpoint falls at     #
+# the same fraction of a sample interval, so each interval is two exact   #
+# ramp responses and the whole simulation is one first-order recursive     #
+# filter, y[i+1] = a * y[i] + g[i], evaluated with scipy.signal.lfilter.  #
+# Differentiating that recurrence gives the exact parameter sensitivities #
+# with three more filter passes.                                           #
+#                                                                          #
+# Function               Return Value                                      #
+# ---------------------  ------------------------------------------------  #
+# simulate(x, t, u, y0)  model output at the samples, x = [Km, taum,       #
+#                        thetam]                                           #
+# simulate_odeint(...)   the same from the original per-sample odeint loop #
+# sse(x, t, u, yp)       sum of squared errors against the data yp         #
+# sse_grad(x, t, u, yp)  sum of squared errors and its exact gradient      #
+# fit(t, u, yp, x0)      minimize with the exact gradient                  #
+# ======================================================================== #
+
+import numpy as np
+from scipy.integrate import odeint
+from scipy.interpolate import interp1d
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+
+def _ramp(h, taum):
+    # response coefficients over a sub-interval of length h:
+    #   x(h) = a x(0) + v0 (1 - a) + (v1 - v0) c
+    # for dx/dt = (-x + v)/taum with v going linearly from v0 to v1.
+    # c depends only on z = h/taum; cz is dc/dz.
+    a = np.exp(-h / taum)
+    z = h / taum
+    if abs(z) < 1e-4:
+        c = z / 2 - z**2 / 6 + z**3 / 24
+        cz = 1 / 2 - z / 3 + z**2 / 8
+    else:
+        c = 1 - (1 - a) / z
+        cz = (1 - a - z * a) / z**2
+    return a, c, cz
+
+
+def _slope(t, u, s):
+    # slope of the linear interpolation of the samples at s, 0 outside the data
+    k = np.searchsorted(t, s, side='right') - 1
+    inside = (k >= 0) & (k < len(t) - 1)
+    k = np.clip(k, 0, len(t) - 2)
+    return np.where(inside, np.diff(u)[k] / np.diff(t)[k], 0.0)
+
+
+def _delayed_input(t, u, u0, s):
+    # u(s) for the linear interpolation of the samples, u0 outside the data
+    return np.interp(s, t, u, left=u0, right=u0)
+
+
+def _grid(t):
+    t = np.asarray(t, dtype=float)
+    dt = t[1] - t[0]
+    if not np.allclose(np.diff(t), dt, rtol=1e-9, atol=0):
+        raise ValueError('the FOPDT simulation needs uniformly sampled data')
+    return t, dt
+
+
+def simulate(x, t, u, y0, u0=None, sensitivities=False):
+    '''
+    Exact FOPDT response at the sample times t for x = [Km, taum, thetam].
+    y0 is the initial (steady-state) output and u0 the steady-state input,
+    u[0] by default.
+
+    With sensitivities=True, also returns the exact derivatives of the
+    response with respect to Km, taum and thetam, shape (len(t), 3), from
+    the differentiated recurrence.
+    '''
+    Km, taum, thetam = x
+    t, dt = _grid(t)
+    u = np.asarray(u, dtype=float)
+    if u0 is None:
+        u0 = u[0]
+    # the delayed-input breakpoints t[k] + thetam fall h1 into an interval
+    h1 = thetam - np.floor(thetam / dt) * dt
+    h2 = dt - h1
+    a1, c1, cz1 = _ramp(h1, taum)
+    a2, c2, cz2 = _ramp(h2, taum)
+    A = a1 * a2
+    # input deviation (per unit Km) at the start, breakpoint and end of every
+    # interval; the breakpoints are sample times, and past the last sample the
+    # input drops back to u0, so the second sub-interval starts from u0 there
+    sa = t[:-1] - thetam
+    sb = t[:-1] + h1 - thetam
+    sc = t[1:] - thetam
+    wa = _delayed_input(t, u, u0, sa) - u0
+    wb = _delayed_input(t, u, u0, sb) - u0
+    wb2 = np.where(sb >= t[-1] - 1e-9 * dt, 0.0, wb)
+    wc = _delayed_input(t, u, u0, sc) - u0
+    p1 = wa * (1 - a1) + (wb - wa) * c1
+    g = a2 * p1 + wb2 * (1 - a2) + (wc - wb2) * c2
+    # x[i+1] = A x[i] + Km g[i], x[0] = 0
+    dev = np.zeros(len(t))
+    dev[1:] = lfilter([1.0], [1.0, -A], Km * g)
+    if not sensitivities:
+        return y0 + dev
+
+    # taum: da/dtaum = a z/taum, dc/dtaum = -cz z/taum with z = h/taum
+    da1, da2 = a1 * h1 / taum**2, a2 * h2 / taum**2
+    dc1, dc2 = -cz1 * h1 / taum**2, -cz2 * h2 / taum**2
+    dg_tau = (da2 * p1 + a2 * (-wa * da1 + (wb - wa) * dc1)
+              - wb2 * da2 + (wc - wb2) * dc2)
+    r_tau = A * dt / taum**2 * dev[:-1] + Km * dg_tau
+    # thetam: h1 grows and h2 shrinks, the breakpoint value is a fixed
+    # sample, and the interval ends move along the input with slope -du/ds
+    da1, da2 = -a1 / taum, a2 / taum
+    dc1, dc2 = cz1 / taum, -cz2 / taum
+    dwa = -_slope(t, u, sa)
+    dwc = -_slope(t, u, sc)
+    dp1 = dwa * (1 - a1) - wa * da1 - dwa * c1 + (wb - wa) * dc1
+    dg_theta = da2 * p1 + a2 * dp1 - wb2 * da2 + dwc * c2 + (wc - wb2) * dc2
+    r_theta = Km * dg_theta
+    dym = np.zeros((len(t), 3))
+    dym[1:] = lfilter([1.0], [1.0, -A], np.column_stack([g, r_tau, r_theta]), axis=0)
+    return y0 + dev, dym
+
+
+def sse(x, t, u, yp, u0=None):
+    '''Sum of squared errors between the FOPDT response and the data yp.'''
+    r = simulate(x, t, u, yp[0], u0) - yp
+    return r @ r
+
+
+def sse_grad(x, t, u, yp, u0=None):
+    '''
+    Sum of squared errors and its exact gradient with respect to
+    [Km, taum, thetam], for minimize(sse_grad, x0, args=(t, u, yp), jac=True).
+    '''
+    ym, dym = simulate(x, t, u, yp[0], u0, sensitivities=True)
+    r = ym - yp
+    return r @ r, 2 * r @ dym
+
+
+def fit(t, u, yp, x0, u0=None, **kwargs):
+    '''Fit [Km, taum, thetam] to the data with the analytic gradient.'''
+    return minimize(sse_grad, x0, args=(t, u, yp, u0), jac=True, **kwargs)
+
+
+# original formulation: one odeint call per sample with an interp1d input
+def fopdt(y, t, uf, Km, taum, thetam, y0, u0):
+    # time-shift u
+    try:
+        if (t-thetam) <= 0:
+            um = uf(0.0)
+        else:
+            um = uf(t-thetam)
+    except:
+        um = u0
+    # calculate derivative
+    dydt = (-(y-y0) + Km * (um-u0))/taum
+    return dydt
+
+
+def simulate_odeint(x, t, u, y0, u0=None):
+    '''Reference FOPDT response from the per-sample odeint loop.'''
+    Km, taum, thetam = x
+    if u0 is None:
+        u0 = u[0]
+    uf = interp1d(t, u)
+    ym = np.zeros(len(t))
+    ym[0] = y0
+    for i in range(len(t)-1):
+        y1 = odeint(fopdt, ym[i], [t[i], t[i+1]], args=(uf, Km, taum, thetam, y0, u0))
+        ym[i+1] = y1[-1, 0]
+    return ym
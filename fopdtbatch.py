@@ -0,0 +1,171 @@
+# ======================================================================== #
+# fopdtbatch.py                                                            #
+#                                                                          #
+# Batch FOPDT identification of step-test CSVs (a_Fan_step.csv,            #
+# w_q_step.csv, ...).  Every file is fitted with fopdtident.identify in    #
+# its own worker process and the results are collected into one summary    #
+# table of Kp, tau, theta and SSE with the fit time of each file.  Results #
+# are cached in a JSON file keyed by the file contents and fit settings,   #
+# so unchanged files are not refitted.                                     #
+#                                                                          #
+# Run from the repository root, for example:                               #
+# python fopdtbatch.py Air Water --columns '*_q_step*=Q:Tcpu'              #
+#     --columns '*_Ta_step*=T_air:Tcpu' --tsleep 60 --out fopdt_summary.csv #
+# Columns are given as [PATTERN=]INPUT:OUTPUT; the first pattern matching  #
+# a file name wins and Fan:Tcpu is used for files no pattern matches.     #
+# ======================================================================== #
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import fopdtident
+
+DEFAULT_COLUMNS = ('Fan', 'Tcpu')
+DEFAULT_BOUNDS = ((-1e4, 1e4), (.01, 1000), (0, 200))
+SUMMARY_COLUMNS = ['file', 'input', 'output', 'Kp', 'tau', 'theta', 'SSE', 'samples',
+                   'starts', 'fit_time', 'cached']
+
+
+def find_files(paths):
+    '''Step-test CSVs from directories (every *.csv inside), globs or file names.'''
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.csv'))))
+        else:
+            files.extend(sorted(glob.glob(path)) or [path])
+    return list(dict.fromkeys(files))
+
+
+def parse_columns(specs):
+    '''[(pattern, input, output)] from [PATTERN=]INPUT:OUTPUT strings.'''
+    mapping = []
+    for spec in specs:
+        pattern, _, columns = spec.rpartition('=')
+        u_col, sep, y_col = columns.partition(':')
+        if not sep or not u_col or not y_col:
+            raise ValueError(f'column mapping must be [PATTERN=]INPUT:OUTPUT, got {spec!r}')
+        mapping.append((pattern or '*', u_col, y_col))
+    return mapping
+
+
+def columns_for(path, mapping):
+    name = os.path.basename(path)
+    for pattern, u_col, y_col in mapping:
+        if fnmatch.fnmatch(name, pattern):
+            return u_col, y_col
+    return DEFAULT_COLUMNS
+
+
+def cache_key(path, settings):
+    '''Hash of the file contents together with the fit settings.'''
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    h.update(json.dumps(settings, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def fit_file(path, u_col, y_col, tsleep, bounds, n_starts, seed):
+    '''Summary row for one step-test CSV.'''
+    start = time.perf_counter()
+    data = pd.read_csv(path, index_col=0)
+    t = data['Time'].to_numpy()[tsleep:]
+    u = data[u_col].to_numpy()[tsleep:]
+    y = data[y_col].to_numpy()[tsleep:]
+    result = fopdtident.identify(t, u, y, bounds, n_starts=n_starts, processes=1, seed=seed)
+    return {'file': path, 'input': u_col, 'output': y_col,
+            'Kp': result.x[0], 'tau': result.x[1], 'theta': result.x[2], 'SSE': result.fun,
+            'samples': len(t), 'starts': result.nstarts,
+            'fit_time': time.perf_counter() - start, 'cached': False}
+
+
+def identify_files(paths, columns=(), tsleep=0, bounds=DEFAULT_BOUNDS, n_starts=16, seed=0,
+                   processes=None, cache='.fopdt_cache.json'):
+    '''
+    Fit every step-test CSV found in paths, one file per worker process,
+    and return the summary table as a DataFrame. Files whose contents and
+    settings match an entry in the cache file are not refitted; cache=None
+    turns the cache off. A file whose fit raises is reported and left out
+    of the table, its error kept in summary.attrs['failed'] by path; the
+    other fits are still returned and cached.
+    '''
+    mapping = parse_columns(columns)
+    cached = {}
+    if cache is not None and os.path.exists(cache):
+        with open(cache) as f:
+            cached = json.load(f)
+
+    rows = {}
+    jobs = {}
+    for path in find_files(paths):
+        u_col, y_col = columns_for(path, mapping)
+        settings = {'input': u_col, 'output': y_col, 'tsleep': tsleep,
+                    'bounds': [list(b) for b in bounds], 'starts': n_starts, 'seed': seed}
+        key = cache_key(path, settings)
+        if key in cached:
+            rows[path] = dict(cached[key], file=path, cached=True)
+        else:
+            jobs[path] = (key, (path, u_col, y_col, tsleep, bounds, n_starts, seed))
+
+    failed = {}
+    if jobs:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = {path: pool.submit(fit_file, *args) for path, (key, args) in jobs.items()}
+            for path, future in futures.items():
+                try:
+                    rows[path] = future.result()
+                except Exception as e:
+                    # report the file and keep the fits of the others
+                    failed[path] = f'{type(e).__name__}: {e}'
+                    print(f'{path}: fit failed, {failed[path]}')
+                    continue
+                cached[jobs[path][0]] = rows[path]
+        if cache is not None:
+            with open(cache, 'w') as f:
+                json.dump(cached, f, indent=1)
+
+    summary = pd.DataFrame([rows[p] for p in find_files(paths) if p in rows], columns=SUMMARY_COLUMNS)
+    summary.attrs['failed'] = failed
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit FOPDT models to many step-test CSVs.')
+    parser.add_argument('paths', nargs='+', help='CSV files, globs or directories')
+    parser.add_argument('--columns', action='append', default=[], metavar='[PATTERN=]INPUT:OUTPUT',
+                        help='input and output columns, optionally for file names matching PATTERN '
+                             f'(default {":".join(DEFAULT_COLUMNS)})')
+    parser.add_argument('--tsleep', type=int, default=0, help='samples to skip at the start of each file')
+    parser.add_argument('--bounds', type=float, nargs=6, metavar=('KP_LO', 'KP_HI', 'TAU_LO', 'TAU_HI',
+                                                                   'THETA_LO', 'THETA_HI'))
+    parser.add_argument('--starts', type=int, default=16, help='multi-start points per file')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--cache', default='.fopdt_cache.json', help='result cache file')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--out', default='fopdt_summary.csv', help='summary table (CSV)')
+    args = parser.parse_args(argv)
+
+    bounds = DEFAULT_BOUNDS if args.bounds is None else tuple(zip(args.bounds[::2], args.bounds[1::2]))
+    start = time.perf_counter()
+    summary = identify_files(args.paths, args.columns, args.tsleep, bounds, args.starts, args.seed,
+                             args.processes, None if args.no_cache else args.cache)
+    summary.to_csv(args.out, index=False)
+    print(summary.to_string(index=False))
+    print(f'{len(summary)} files in {time.perf_counter() - start:.2f} s, summary written to {args.out}')
+    if summary.attrs['failed']:
+        print(f'{len(summary.attrs["failed"])} files failed: {", ".join(summary.attrs["failed"])}')
+
+
+if __name__ == '__main__':
+    main()
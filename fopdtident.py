@@ -0,0 +1,106 @@
+# ======================================================================== #
+# fopdtident.py                                                            #
+#                                                                          #
+# Multi-start identification of the FOPDT parameters [Km, taum, thetam]    #
+# without a hand-tuned initial guess.  Bounded local solves (L-BFGS-B      #
+# with the exact gradient from fopdt.sse_grad) are started from points     #
+# spread over the parameter bounds and run on a process pool.  Once        #
+# n_agree starts have converged to within rtol of the best SSE found so    #
+# far, the remaining starts are cancelled and the running ones are told    #
+# to stop at their next iteration.                                         #
+#                                                                          #
+# import fopdtident                                                        #
+# result = fopdtident.identify(t, u, yp, bounds=[(-5000, 0), (.01, 500),   #
+#                              (0, 100)])                                  #
+# result.x, result.fun                                                     #
+# ======================================================================== #
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Event
+
+import numpy as np
+from scipy.optimize import OptimizeResult, minimize
+
+import fopdt
+
+# data and stop flag shared with the pool workers
+_data = None
+_stop = None
+
+
+def _init_worker(t, u, yp, u0, stop):
+    global _data, _stop
+    _data = (t, u, yp, u0)
+    _stop = stop
+
+
+def _stop_requested(xk):
+    if _stop.is_set():
+        raise StopIteration
+
+
+def _local_solve(x_start, bounds, maxiter):
+    t, u, yp, u0 = _data
+    with np.errstate(all='ignore'):
+        sol = minimize(fopdt.sse_grad, x_start, args=(t, u, yp, u0), jac=True, method='L-BFGS-B',
+                       bounds=bounds, callback=_stop_requested, options={'maxiter': maxiter})
+    return OptimizeResult(x_start=np.asarray(x_start), x=sol.x, fun=float(sol.fun),
+                          success=bool(sol.success), nfev=sol.nfev, message=str(sol.message))
+
+
+def start_points(bounds, n_starts, x0=None, seed=0):
+    '''x0 (if given) followed by points drawn uniformly within bounds.'''
+    lo, hi = np.array(bounds, dtype=float).T
+    rng = np.random.default_rng(seed)
+    points = lo + rng.random((n_starts, len(lo))) * (hi - lo)
+    if x0 is not None:
+        points[0] = np.clip(x0, lo, hi)
+    return points
+
+
+def identify(t, u, yp, bounds, x0=None, n_starts=16, u0=None, processes=None,
+             rtol=1e-3, n_agree=2, seed=0, maxiter=500):
+    '''
+    Fit [Km, taum, thetam] within bounds from n_starts starting points.
+
+    Returns an OptimizeResult with the best x and fun, every completed
+    start in starts, the total nfev, the wall time in elapsed, and
+    stopped_early when the agreement rule ended the search.
+    processes=1 runs the starts one after another in this process.
+    '''
+    start = time.perf_counter()
+    args = (np.asarray(t, dtype=float), np.asarray(u, dtype=float), np.asarray(yp, dtype=float), u0)
+    points = start_points(bounds, n_starts, x0, seed)
+    stop = Event()
+    results = []
+
+    def converged_near_best():
+        converged = [r.fun for r in results if r.success]
+        if not converged:
+            return False
+        best = min(converged)
+        return sum(f <= best + rtol * abs(best) for f in converged) >= n_agree
+
+    if processes == 1:
+        _init_worker(*args, stop)
+        for x_start in points:
+            results.append(_local_solve(x_start, bounds, maxiter))
+            if converged_near_best():
+                stop.set()
+                break
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(*args, stop)) as pool:
+            pending = {pool.submit(_local_solve, x_start, bounds, maxiter) for x_start in points}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(f.result() for f in done if not f.cancelled())
+                if not stop.is_set() and converged_near_best():
+                    stop.set()
+                    for f in pending:
+                        f.cancel()
+
+    best = min(results, key=lambda r: r.fun)
+    return OptimizeResult(x=best.x, fun=best.fun, success=best.success, message=best.message,
+                          starts=results, nstarts=len(results), nfev=sum(r.nfev for r in results),
+                          stopped_early=stop.is_set(), elapsed=time.perf_counter() - start)
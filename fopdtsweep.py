@@ -0,0 +1,148 @@
+# ======================================================================== #
+# fopdtsweep.py                                                            #
+#                                                                          #
+# Grid sweeps of the FOPDT fit objective (the SSE from fopdt.sse) over     #
+# one, two or three of the parameters Km, taum and thetam.  Points are     #
+# evaluated in chunks on a process pool, progress is written to stdout,    #
+# and the SSE surface can be saved to an .npz file so the Kp/tau/theta     #
+# range plots can be redrawn without recomputing it.                       #
+#                                                                          #
+# import fopdtsweep                                                        #
+# surface = fopdtsweep.sweep(t, u, yp, x0, {'thetam': np.linspace(0, 100, #
+#                            100)}, out='theta_100Range.npz')              #
+# fopdtsweep.plot_sweep('theta_100Range.npz', 'theta_100Range.png')       #
+# ======================================================================== #
+
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import fopdt
+
+PARAMETERS = ('Km', 'taum', 'thetam')
+
+# data shared with the pool workers
+_data = None
+
+
+def _init_worker(t, u, yp, u0):
+    global _data
+    _data = (t, u, yp, u0)
+
+
+def _evaluate(points):
+    t, u, yp, u0 = _data
+    with np.errstate(all='ignore'):
+        return np.array([fopdt.sse(x, t, u, yp, u0) for x in points])
+
+
+def sweep(t, u, yp, x0, grids, u0=None, processes=None, chunksize=64, progress=True, out=None):
+    '''
+    SSE of the FOPDT model on the grid spanned by grids, a dict from
+    parameter name ('Km', 'taum' or 'thetam') to a 1-D array of values.
+    Parameters not in grids are held at their value in x0.
+
+    Returns a dict with the swept names, their grids, x0 and 'sse', whose
+    axes follow the order of the names. With out, it is also written to
+    that .npz file. processes=1 evaluates in this process.
+    '''
+    names = [p for p in PARAMETERS if p in grids]
+    unknown = set(grids) - set(PARAMETERS)
+    if unknown or not names:
+        raise ValueError(f'grids must name one or more of {PARAMETERS}, got {sorted(grids)}')
+    axes = [np.asarray(grids[p], dtype=float) for p in names]
+    shape = tuple(len(a) for a in axes)
+
+    # every grid point as a full [Km, taum, thetam]
+    points = np.tile(np.asarray(x0, dtype=float), (int(np.prod(shape)), 1))
+    mesh = np.meshgrid(*axes, indexing='ij')
+    for p, m in zip(names, mesh):
+        points[:, PARAMETERS.index(p)] = m.ravel()
+    chunks = [points[i:i + chunksize] for i in range(0, len(points), chunksize)]
+
+    args = (np.asarray(t, dtype=float), np.asarray(u, dtype=float), np.asarray(yp, dtype=float), u0)
+    start = time.perf_counter()
+    results = []
+    done = 0
+    shown = -1
+    if processes == 1:
+        _init_worker(*args)
+        evaluated = map(_evaluate, chunks)
+        pool = None
+    else:
+        pool = Pool(processes, initializer=_init_worker, initargs=args)
+        evaluated = pool.imap(_evaluate, chunks)
+    try:
+        for chunk in evaluated:
+            results.append(chunk)
+            done += len(chunk)
+            percent = 100 * done // len(points)
+            if progress and percent != shown:
+                shown = percent
+                sys.stdout.write(f'\rEvaluated {done}/{len(points)} points ({percent}%, '
+                                 f'{time.perf_counter() - start:.1f} s)')
+                sys.stdout.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if progress:
+        sys.stdout.write('\n')
+
+    surface = {'names': np.array(names), 'x0': np.asarray(x0, dtype=float),
+               'sse': np.concatenate(results).reshape(shape)}
+    surface.update(zip(names, axes))
+    if out is not None:
+        np.savez(out, **surface)
+    return surface
+
+
+def load_sweep(path):
+    '''Sweep result saved by sweep(..., out=path).'''
+    with np.load(path) as f:
+        return {k: f[k] for k in f.files}
+
+
+def best(surface):
+    '''Grid point with the lowest SSE as ([Km, taum, thetam], sse).'''
+    if np.isnan(surface['sse']).all():
+        grid = ' x '.join(f'{p} ({len(surface[str(p)])} points)' for p in surface['names'])
+        raise ValueError(f'sweep over {grid} has no finite SSE: every grid point failed')
+    i = np.unravel_index(np.nanargmin(surface['sse']), surface['sse'].shape)
+    x = surface['x0'].copy()
+    for p, j in zip(surface['names'], i):
+        x[PARAMETERS.index(str(p))] = surface[str(p)][j]
+    return x, surface['sse'][i]
+
+
+def plot_sweep(surface, filename=None):
+    '''
+    Line plot (one parameter) or contour plot (two parameters) of a sweep
+    result or a saved .npz file, marking the best grid point.
+    '''
+    import matplotlib.pyplot as plt
+
+    if isinstance(surface, str):
+        surface = load_sweep(surface)
+    names = [str(p) for p in surface['names']]
+    x, err = best(surface)
+    plt.figure(figsize=(10, 7))
+    if len(names) == 1:
+        p = names[0]
+        plt.plot(surface[p], surface['sse'])
+        plt.xlabel(f'{p} Value')
+        plt.ylabel('SSE Error')
+        plt.text(surface[p][0], err, f'Min Err: {err}\nBest {p}: {x[PARAMETERS.index(p)]}')
+    elif len(names) == 2:
+        plt.contourf(surface[names[1]], surface[names[0]], surface['sse'], 30)
+        plt.colorbar(label='SSE Error')
+        plt.plot(x[PARAMETERS.index(names[1])], x[PARAMETERS.index(names[0])], 'rx')
+        plt.xlabel(f'{names[1]} Value')
+        plt.ylabel(f'{names[0]} Value')
+    else:
+        raise ValueError('only one- and two-parameter sweeps can be plotted')
+    if filename is not None:
+        plt.savefig(filename)
+    return plt.gcf()
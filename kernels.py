@@ -0,0 +1,180 @@
+# ======================================================================== #
+# kernels.py                                                               #
+#                                                                          #
+# Compiled right-hand sides for the step-test models.  sim_air and        #
+# tempSim are rewritten here together with the property correlations     #
+# they use (airproperties icp, vtc, vvs and the rho1atm spline;           #
+# waterproperties ltc and lcp) as scalar math on floats, in one function  #
+# each.  With Numba installed they are compiled with numba.njit and the   #
+# machine code is cached on disk (__pycache__) so later runs start warm;  #
+# without it the same functions run as plain Python, which already skips  #
+# the numpy overhead of the per-call property functions.                  #
+#                                                                          #
+# The kernels have the odeint signature of the models they replace:       #
+# from kernels import sim_air, tempSim                                     #
+# simulate(sim_air, [Ta], time, q, fan, T_air, sample_clock=True)         #
+# kernels.BACKEND is 'numba' or 'python'.  The copied correlations are    #
+# checked against the property modules at import (check()).               #
+# ======================================================================== #
+
+import math
+
+import numpy as np
+from scipy.interpolate import PPoly
+
+import airproperties as ap
+import waterproperties as wp
+import Air.firstPrinciplesAir as fpa
+import Water.firstOrderWater as fow
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKEND = 'python' if numba is None else 'numba'
+
+
+def jit(f):
+    '''numba.njit with the on-disk cache, or f itself without Numba.'''
+    if numba is None:
+        return f
+    return numba.njit(cache=True)(f)
+
+
+# rho1atm spline as piecewise cubic coefficients, highest power first
+_rho = PPoly.from_spline(ap.rho_tck)
+RHO_X = np.ascontiguousarray(_rho.x)
+RHO_C = np.ascontiguousarray(_rho.c.T)
+
+# model constants
+AIR_MW = ap.mw
+A_P, A_K, A_AC, A_L, A_FAN_CA = fpa.P, fpa.k_copper, fpa.Ac, fpa.L, fpa.fan_ca
+W_CPU_MC = fow.cpu_m * fow.cpu_cp
+W_CPU_A, W_CP_L, W_CP_K = fow.cpu_A, fow.coldPlate_l, fow.coldPlate_k
+W_LIQUID_M, W_HX_A, W_HX_WIDTH, W_FAN_CA = fow.liquid_m, fow.hx_A, fow.hx_width, fow.fan_ca
+
+
+@jit
+def rho1atm(t):
+    x = RHO_X
+    i = np.searchsorted(x, t, side='right') - 1
+    i = min(max(i, 0), len(x) - 2)
+    dx = t - x[i]
+    c = RHO_C[i]
+    return ((c[0] * dx + c[1]) * dx + c[2]) * dx + c[3]
+
+
+@jit
+def icp(t):
+    y = 2.8958E+04 + 9.3900E+03 * ((3.0120E+03 / t) / math.sinh(3.0120E+03 / t))**2 \
+        + 7.5800E+03 * ((1.4840E+03 / t) / math.cosh(1.4840E+03 / t))**2
+    return y / 1000
+
+
+@jit
+def vtc(t):
+    return 3.1417E-04 * t**7.7860E-01 / (1 + -7.1160E-01 / t + 2.1217E+03 / t**2)
+
+
+@jit
+def vvs(t):
+    return 1.4250E-06 * t**5.0390E-01 / (1 + 1.0830E+02 / t + 0 / t**2)
+
+
+@jit
+def air_nu_pr_k(t):
+    # nu, pr and k at 1 atm, as airproperties.props1atm
+    rho = rho1atm(t)
+    mu = vvs(t)
+    k = vtc(t)
+    cp = icp(t)
+    nu = mu / rho
+    alpha = k / rho * AIR_MW / cp
+    return nu, nu / alpha, k
+
+
+@jit
+def ltc(t):
+    return -4.3200E-01 + 5.7255E-03 * t + -8.0780E-06 * t**2 + 1.8610E-09 * t**3
+
+
+@jit
+def lcp(t):
+    return (2.7637E+05 + -2.0901E+03 * t + 8.1250E+00 * t**2 + -1.4116E-02 * t**3 + 9.3701E-06 * t**4) / 1000
+
+
+@jit
+def sim_air_scalar(T, t, Q_CPU, vol_air, T_air):
+    θb = T - T_air
+    vel_air = vol_air / A_FAN_CA
+    fin_gap_width = 10.5 / 100 / 50
+    nu, pr, k = air_nu_pr_k(T_air)
+    Re_air = 50 * vel_air * fin_gap_width / nu
+    Nu_air = .680 * Re_air**.5 * pr
+    h = Nu_air * k / fin_gap_width
+    m = math.sqrt(2 * h / (A_K * t + .001))
+    M = math.sqrt(h * A_P * A_K * A_AC) * θb
+    mL = m * A_L
+    r = h / m / A_K
+    Qfin = M * ((math.sinh(mL) + r * math.cosh(mL)) / (math.cosh(mL) + r * math.sinh(mL)))
+    return Q_CPU - Qfin
+
+
+@jit
+def sim_air(y, t, Q_CPU, vol_air, T_air):
+    '''Air.firstPrinciplesAir.sim_air for the one-element state y.'''
+    out = np.empty(1)
+    out[0] = sim_air_scalar(y[0], t, Q_CPU, vol_air, T_air)
+    return out
+
+
+@jit
+def tempSim(y, t, q, vol_air, T_air):
+    '''Water.firstOrderWater.tempSim for the state y = [T_cpu, T_liquid].'''
+    T_cpu = y[0]
+    T_liquid = y[1]
+    vel_air = vol_air / (2 * W_FAN_CA)
+    nu, pr, k = air_nu_pr_k(T_air)
+    Re_air = vel_air * W_HX_WIDTH / nu
+    Nu_air = .680 * Re_air**.5 * pr
+    h_air_hx = Nu_air * k / W_HX_WIDTH
+    h_liquid = 3.66 * ltc(T_liquid) / .005
+
+    R_air_to_hx = 1 / (h_air_hx * W_HX_A)
+    R_hx = .0005 / (W_CP_K * W_HX_A)
+    R_hx_to_liquid = 1 / (h_liquid * W_HX_A)
+    R_liquid_to_coldPlate = 1 / (h_liquid * W_CPU_A * 2.5)
+    R_coldPlate = W_CP_L / (W_CP_K * W_CPU_A)
+
+    q_cpu_to_liquid = (T_liquid - T_cpu) / (R_liquid_to_coldPlate + R_coldPlate)
+    q_liquid_to_air = (T_air - T_liquid) / (R_air_to_hx + R_hx + R_hx_to_liquid)
+
+    out = np.empty(2)
+    out[0] = (q + q_cpu_to_liquid) / W_CPU_MC
+    out[1] = (-q_cpu_to_liquid + q_liquid_to_air) / (W_LIQUID_M * lcp(T_liquid))
+    return out
+
+
+def check(rtol=1e-12):
+    '''
+    Compare the kernel property correlations with airproperties and
+    waterproperties at a few temperatures; raises RuntimeError naming the
+    first one that differs, e.g. after a coefficient was edited in only
+    one of the two places.
+    '''
+    pairs = [(rho1atm, ap.rho1atm, (250.0, 300.0, 350.0, 400.0)),
+             (icp, ap.icp, (250.0, 300.0, 350.0, 400.0)),
+             (vtc, ap.vtc, (250.0, 300.0, 350.0, 400.0)),
+             (vvs, ap.vvs, (250.0, 300.0, 350.0, 400.0)),
+             (ltc, wp.ltc, (280.0, 320.0, 360.0)),
+             (lcp, wp.lcp, (280.0, 320.0, 360.0))]
+    for kernel, reference, temperatures in pairs:
+        for T in temperatures:
+            a, b = kernel(T), float(reference(T))
+            if abs(a - b) > rtol * abs(b):
+                raise RuntimeError(f'kernels.{kernel.__name__}({T}) = {a!r} differs from '
+                                   f'{reference.__module__}.{reference.__name__} = {b!r}')
+
+
+check()
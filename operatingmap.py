@@ -0,0 +1,176 @@
+# ======================================================================== #
+# operatingmap.py                                                          #
+#                                                                          #
+# Steady-state operating maps of the air and water cooling models.  The    #
+# steady CPU temperature (and liquid temperature for the water loop) is    #
+# computed once over a (q, fan, T_air) grid with the vectorized solvers    #
+# Air.firstPrinciplesAir.sampled_steady_state and                          #
+# Water.firstOrderWater.steady_state, cached on disk under a key made from #
+# the model constants and the grid, and queried by trilinear               #
+# interpolation.  fan is the fraction of full fan flow (fan_max * 2, as    #
+# in the step tests); queries outside the grid return nan.                 #
+#                                                                          #
+# import operatingmap                                                      #
+# m = operatingmap.operating_map('water')                                  #
+# m.query(100, .5, 298.15)             # {'Tcpu': ..., 'Tw': ...}          #
+# m.fan_for(273.15 + 60, 100, 298.15)  # fan fraction for a CPU temperature #
+# ======================================================================== #
+
+import bisect
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import Air.firstPrinciplesAir as fpa
+import Water.firstOrderWater as fow
+
+MODELS = ('air', 'water')
+
+# default grid: CPU power (W), fan fraction and ambient temperature (K)
+Q_GRID = np.linspace(0, 105, 22)
+FAN_GRID = np.linspace(.05, 1, 20)
+T_AIR_GRID = np.linspace(273.15 + 10, 273.15 + 40, 13)
+
+CACHE_DIR = '.opmap_cache'
+VERSION = 1
+
+
+def _constants(module):
+    # module-level numbers of a model, the inputs of its steady state
+    return {k: v for k, v in sorted(vars(module).items())
+            if not k.startswith('_') and isinstance(v, (int, float)) and not isinstance(v, bool)}
+
+
+def cache_key(model, q, fan, T_air):
+    '''Hash of the model name and constants, the grid and the map version.'''
+    module = fpa if model == 'air' else fow
+    h = hashlib.sha256(json.dumps({'model': model, 'version': VERSION,
+                                   'constants': _constants(module)}, sort_keys=True).encode())
+    for axis in (q, fan, T_air):
+        h.update(np.ascontiguousarray(axis, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def solve(model, q, fan, T_air):
+    '''Steady temperatures on the grid q x fan x T_air as a dict of 3-D arrays.'''
+    Q, F, Ta = np.meshgrid(q, fan, T_air, indexing='ij')
+    if model == 'air':
+        return {'Tcpu': fpa.sampled_steady_state(Q, F * fpa.fan_max * 2, Ta)}
+    if model == 'water':
+        T_cpu, T_liquid = fow.steady_state(Q, F * fow.fan_max * 2, Ta)
+        return {'Tcpu': T_cpu, 'Tw': T_liquid}
+    raise ValueError(f'model must be one of {MODELS}, got {model!r}')
+
+
+class OperatingMap:
+    '''Steady temperatures on a (q, fan, T_air) grid with interpolated queries.'''
+
+    def __init__(self, model, q, fan, T_air, values):
+        self.model = model
+        self.axes = [np.asarray(a, dtype=float) for a in (q, fan, T_air)]
+        self.values = values
+        # python lists for the scalar path
+        self._axes = [a.tolist() for a in self.axes]
+        self._values = {k: v.tolist() for k, v in values.items()}
+
+    def _cell(self, x, axis):
+        # lower node index and fraction of x in its cell, None outside
+        a = self._axes[axis]
+        if not a[0] <= x <= a[-1]:
+            return None
+        i = min(bisect.bisect_right(a, x) - 1, len(a) - 2)
+        return i, (x - a[i]) / (a[i+1] - a[i])
+
+    def _query1(self, name, q, fan, T_air):
+        cells = [self._cell(x, k) for k, x in enumerate((q, fan, T_air))]
+        if None in cells:
+            return float('nan')
+        (i, u), (j, v), (k, w) = cells
+        V = self._values[name]
+        c00 = V[i][j][k] + w * (V[i][j][k+1] - V[i][j][k])
+        c01 = V[i][j+1][k] + w * (V[i][j+1][k+1] - V[i][j+1][k])
+        c10 = V[i+1][j][k] + w * (V[i+1][j][k+1] - V[i+1][j][k])
+        c11 = V[i+1][j+1][k] + w * (V[i+1][j+1][k+1] - V[i+1][j+1][k])
+        c0 = c00 + v * (c01 - c00)
+        c1 = c10 + v * (c11 - c10)
+        return c0 + u * (c1 - c0)
+
+    def _queryn(self, name, q, fan, T_air):
+        idx = []
+        frac = []
+        inside = True
+        for a, x in zip(self.axes, (q, fan, T_air)):
+            i = np.clip(np.searchsorted(a, x, side='right') - 1, 0, len(a) - 2)
+            idx.append(i)
+            frac.append((x - a[i]) / (a[i+1] - a[i]))
+            inside = inside & (x >= a[0]) & (x <= a[-1])
+        (i, j, k), (u, v, w) = idx, frac
+        V = self.values[name]
+        c = 0.0
+        for di, wi in ((0, 1 - u), (1, u)):
+            for dj, wj in ((0, 1 - v), (1, v)):
+                for dk, wk in ((0, 1 - w), (1, w)):
+                    c = c + wi * wj * wk * V[i + di, j + dj, k + dk]
+        return np.where(inside, c, np.nan)
+
+    def query(self, q, fan, T_air, name=None):
+        '''
+        Interpolated steady temperatures at q (W), fan (fraction) and T_air
+        (K), scalars or arrays: a dict of all values, or one value with name.
+        '''
+        names = list(self.values) if name is None else [name]
+        if np.ndim(q) == np.ndim(fan) == np.ndim(T_air) == 0:
+            out = {n: self._query1(n, float(q), float(fan), float(T_air)) for n in names}
+        else:
+            q, fan, T_air = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (q, fan, T_air)))
+            out = {n: self._queryn(n, q, fan, T_air) for n in names}
+        return out if name is None else out[name]
+
+    def fan_for(self, T_cpu, q, T_air):
+        '''
+        Smallest fan fraction on the grid range that keeps the steady CPU
+        temperature at or below T_cpu for q and T_air (feedforward); nan when
+        even full fan is not enough, the lowest grid fan when it is never
+        exceeded.
+        '''
+        fans = self.axes[1]
+        T = np.array([self.query(q, f, T_air, 'Tcpu') for f in fans])  # falls with fan
+        T_cpu = float(T_cpu)
+        if np.isnan(T).any() or T[-1] > T_cpu:
+            return float('nan')
+        if T[0] <= T_cpu:
+            return float(fans[0])
+        j = int(np.argmax(T <= T_cpu))
+        return float(fans[j-1] + (T[j-1] - T_cpu) / (T[j-1] - T[j]) * (fans[j] - fans[j-1]))
+
+    def save(self, path):
+        np.savez(path, model=self.model, q=self.axes[0], fan=self.axes[1], T_air=self.axes[2], **self.values)
+
+
+def load_map(path):
+    '''OperatingMap saved with OperatingMap.save.'''
+    with np.load(path) as f:
+        values = {k: f[k] for k in f.files if k not in ('model', 'q', 'fan', 'T_air')}
+        return OperatingMap(str(f['model']), f['q'], f['fan'], f['T_air'], values)
+
+
+def operating_map(model, q=Q_GRID, fan=FAN_GRID, T_air=T_AIR_GRID, cache_dir=CACHE_DIR):
+    '''
+    Operating map of model ('air' or 'water') on the grid, read from
+    cache_dir when a map with the same model constants and grid exists,
+    otherwise computed and saved there. cache_dir=None disables the cache.
+    '''
+    if model not in MODELS:
+        raise ValueError(f'model must be one of {MODELS}, got {model!r}')
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f'{model}-{cache_key(model, q, fan, T_air)[:16]}.npz')
+        if os.path.exists(path):
+            return load_map(path)
+    result = OperatingMap(model, q, fan, T_air, solve(model, q, fan, T_air))
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        result.save(path)
+    return result
@@ -0,0 +1,111 @@
+# ======================================================================== #
+# pidcontroller.py                                                         #
+#                                                                          #
+# Stateful PID fan controller for long-running loops.  The control law is  #
+# the one of the tuning scripts and closedloop.simulate_pid: PID on the    #
+# error with derivative on the measurement, the integral frozen while the  #
+# output saturates (anti-reset windup), and output changes limited to      #
+# +/- rate times the previous output.  Only the previous measurement,      #
+# output and integral are kept, so memory does not grow with the number of #
+# samples; history, when asked for, goes into a fixed-size ring buffer.    #
+#                                                                          #
+# import pidcontroller                                                     #
+# pid = pidcontroller.PIDController(Kc, tauI, tauD, u0=100, history=3600)  #
+# u = pid.update(T_cpu, sp, dt)                                            #
+# pid.history()  # last 3600 samples as a structured array                 #
+# ======================================================================== #
+
+from array import array
+
+import numpy as np
+
+# columns of a history record
+HISTORY_FIELDS = ('time', 'pv', 'sp', 'op', 'P', 'I', 'D', 'E')
+
+
+class PIDController:
+    '''
+    PID controller with output limits op_lo and op_hi, anti-reset windup and
+    a rate limit relative to the previous output. history is the number of
+    most recent samples to record (0 records nothing).
+    '''
+
+    __slots__ = ('Kc', 'tauI', 'tauD', 'op_lo', 'op_hi', 'rate', 'u0',
+                 'op', 'I', 'pv_last', 'time', 'P', 'D', 'E',
+                 '_buf', '_capacity', '_count')
+
+    def __init__(self, Kc, tauI, tauD=0, u0=100, op_lo=0, op_hi=100, rate=.3, history=0):
+        self.Kc = float(Kc)
+        self.tauI = float(tauI)
+        self.tauD = float(tauD)
+        self.op_lo = float(op_lo)
+        self.op_hi = float(op_hi)
+        self.rate = float(rate)
+        self.u0 = float(u0)
+        self._capacity = int(history)
+        self._buf = array('d', bytes(8 * len(HISTORY_FIELDS) * self._capacity))
+        self.reset()
+
+    def reset(self, u0=None):
+        '''Clear the controller state (and history), starting again from output u0.'''
+        if u0 is not None:
+            self.u0 = float(u0)
+        self.op = self.u0
+        self.I = 0.0
+        self.pv_last = None
+        self.time = 0.0
+        self.P = self.D = self.E = 0.0
+        self._count = 0
+
+    def update(self, pv, sp, dt):
+        '''New controller output for measurement pv and setpoint sp after dt.'''
+        E = sp - pv
+        P = self.Kc * E
+        I = self.Kc / self.tauI * (E * dt) + self.I
+        D = 0.0 if self.pv_last is None else -self.Kc * self.tauD * (pv - self.pv_last) / dt
+        op = P + I + D
+        # anti reset windup prevention
+        if op > self.op_hi:
+            op = self.op_hi
+        elif op < self.op_lo:
+            op = self.op_lo
+        else:
+            self.I = I
+        # rate limit relative to the previous output
+        lo = self.op * (1 - self.rate)
+        hi = self.op * (1 + self.rate)
+        if op < lo:
+            op = lo
+        elif op > hi:
+            op = hi
+
+        self.op = op
+        self.pv_last = pv
+        self.time += dt
+        self.P = P
+        self.D = D
+        self.E = E
+        if self._capacity:
+            self._record(pv, sp)
+        return op
+
+    def _record(self, pv, sp):
+        buf = self._buf
+        j = (self._count % self._capacity) * 8
+        buf[j] = self.time
+        buf[j + 1] = pv
+        buf[j + 2] = sp
+        buf[j + 3] = self.op
+        buf[j + 4] = self.P
+        buf[j + 5] = self.I
+        buf[j + 6] = self.D
+        buf[j + 7] = self.E
+        self._count += 1
+
+    def history(self):
+        '''Recorded samples, oldest first, as a structured array with HISTORY_FIELDS.'''
+        dtype = np.dtype([(name, float) for name in HISTORY_FIELDS])
+        records = np.frombuffer(self._buf, dtype=dtype)
+        if self._count <= self._capacity:
+            return records[:self._count].copy()
+        return np.roll(records, -(self._count % self._capacity))
@@ -0,0 +1,138 @@
+# ======================================================================== #
+# propertytables.py                                                        #
+#                                                                          #
+# Opt-in tabulated backend for airproperties and waterproperties.          #
+# The properties that a table answers faster than their correlation (the   #
+# spline-backed and composite ones) are evaluated once on a uniform        #
+# temperature grid over the operating range (250 K to 400 K by default),   #
+# and lookups are answered by linear interpolation.  The grid is refined   #
+# when a table is built until the relative error against the exact         #
+# correlation, checked at points between the grid nodes, is below rtol.    #
+# Temperatures outside the table range fall back to the exact correlation. #
+#                                                                          #
+# The tabulated libraries mirror the modules they are built from:          #
+# import propertytables                                                    #
+# air = propertytables.air()                                               #
+# air.rho1atm(t), air.pr1atm(t), air.props1atm(t), air.mw, ...             #
+#                                                                          #
+# To run a simulator on the tabulated backend, rebind its property module: #
+# import Air.firstPrinciplesAir as fpa                                     #
+# fpa.ap = propertytables.air()                                            #
+# ======================================================================== #
+
+import types
+from functools import lru_cache
+
+import numpy as np
+
+import airproperties
+import waterproperties
+
+# default operating range (K) and relative error bound
+tmin = 250.0
+tmax = 400.0
+rtol = 1e-6
+
+# temperature-dependent properties that are tabulated: only those faster
+# as a table for both scalars and arrays (benchmarks/benchPropertyTables.py).
+# The single closed-form correlations (icp, vtc, vvs, ldn, lcp, ltc, vp,
+# hvp, lvs) cost about as much as an interpolation or less, and stay exact.
+AIR_PROPERTIES = ('rho1atm', 'nu1atm', 'alpha1atm', 'pr1atm')
+WATER_PROPERTIES = ('nu', 'pr', 'vdnsat')
+
+# airproperties.props1atm field -> property (tabulated or exact)
+PROPS1ATM_FIELDS = {'rho': 'rho1atm', 'mu': 'vvs', 'k': 'vtc', 'cp': 'icp',
+                    'nu': 'nu1atm', 'alpha': 'alpha1atm', 'pr': 'pr1atm'}
+
+
+class PropertyTable:
+    '''
+    Linear interpolation of func(t) on a uniform grid between tmin and tmax.
+    The grid is doubled until the largest relative error found at check
+    points between the nodes is at most rtol; that error is kept as .error.
+    '''
+
+    def __init__(self, func, tmin=tmin, tmax=tmax, rtol=rtol, n=64, max_n=2**20):
+        self.func = func
+        self.tmin = float(tmin)
+        self.tmax = float(tmax)
+        self.rtol = rtol
+        while True:
+            self.t = np.linspace(self.tmin, self.tmax, n + 1)
+            self.y = np.asarray(func(self.t), dtype=float)
+            self.n = n
+            self.scale = n / (self.tmax - self.tmin)  # grid intervals per K
+            self.y0 = self.y[:-1]
+            self.dy = np.diff(self.y)
+            # python lists for the scalar path, which avoids numpy scalars
+            self._y0 = self.y0.tolist()
+            self._dy = self.dy.tolist()
+            self.error = self.max_error()
+            if self.error <= rtol:
+                break
+            if 2 * n > max_n:
+                raise ValueError(f'{getattr(func, "__name__", func)} could not be tabulated to a '
+                                 f'relative error of {rtol} with {max_n} intervals '
+                                 f'(reached {self.error:.3g})')
+            n *= 2
+
+    def max_error(self, per_interval=7):
+        # largest relative error at per_interval evenly spaced points inside
+        # every grid interval (an odd count so the midpoint is included)
+        frac = np.arange(1, per_interval + 1) / (per_interval + 1)
+        tc = (self.t[:-1, None] + frac * np.diff(self.t)[:, None]).ravel()
+        exact = np.asarray(self.func(tc), dtype=float)
+        return float(np.max(np.abs(self(tc) - exact) / np.abs(exact)))
+
+    def __call__(self, t):
+        if type(t) is float or np.ndim(t) == 0:
+            t = float(t)
+            if not self.tmin <= t <= self.tmax:
+                return self.func(t)
+            x = (t - self.tmin) * self.scale
+            i = min(int(x), self.n - 1)
+            return self._y0[i] + (x - i) * self._dy[i]
+        t = np.asarray(t, dtype=float)
+        x = (t - self.tmin) * self.scale
+        outside = (x < 0) | (x > self.n)
+        i = x.astype(np.intp)
+        np.clip(i, 0, self.n - 1, out=i)
+        y = self.y0.take(i) + (x - i) * self.dy.take(i)
+        if outside.any():
+            y[outside] = self.func(t[outside])
+        return y
+
+
+def tabulate(module, names, tmin=tmin, tmax=tmax, rtol=rtol):
+    '''
+    Namespace with the public constants and functions of module, where the
+    properties in names are replaced by PropertyTables.
+    '''
+    lib = types.SimpleNamespace()
+    for name in dir(module):
+        if not name.startswith('_'):
+            setattr(lib, name, getattr(module, name))
+    lib.tables = {}
+    for name in names:
+        lib.tables[name] = PropertyTable(getattr(module, name), tmin, tmax, rtol)
+        setattr(lib, name, lib.tables[name])
+    return lib
+
+
+@lru_cache(maxsize=None)
+def air(tmin=tmin, tmax=tmax, rtol=rtol):
+    '''Tabulated airproperties (built once per set of arguments).'''
+    lib = tabulate(airproperties, AIR_PROPERTIES, tmin, tmax, rtol)
+    fields = [getattr(lib, PROPS1ATM_FIELDS[f]) for f in airproperties.Props1atm._fields]
+
+    def props1atm(t):
+        return airproperties.Props1atm(*(table(t) for table in fields))
+
+    lib.props1atm = props1atm
+    return lib
+
+
+@lru_cache(maxsize=None)
+def water(tmin=tmin, tmax=tmax, rtol=rtol):
+    '''Tabulated waterproperties (built once per set of arguments).'''
+    return tabulate(waterproperties, WATER_PROPERTIES, tmin, tmax, rtol)
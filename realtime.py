@@ -0,0 +1,176 @@
+# ======================================================================== #
+# realtime.py                                                              #
+#                                                                          #
+# Real-time runner for the PID fan controller.  The loop is released on a  #
+# fixed period against time.monotonic(): at every release the plant is     #
+# read, pidcontroller.PIDController.update computes the fan output and it  #
+# is written back.  For every iteration the runner records                 #
+#   jitter   release delay, wake-up time minus scheduled release time      #
+#   latency  compute time, wake-up to output written                       #
+#   missed   the output was written after the next release time            #
+# and summarizes them as histograms.  An overrun does not cause a burst of #
+# catch-up iterations: releases that have already passed are skipped.     #
+#                                                                          #
+# A backend has start(t), read(t) -> temperature and write(op, t), with t  #
+# the plant time in seconds.  Hardware backends can ignore t; the          #
+# simulated backends here advance their model to t, so the loop can be run #
+# on any machine, faster than real time with speed > 1:                    #
+# pid = pidcontroller.PIDController(Kc, tauI, tauD)                        #
+# stats = realtime.run(pid, realtime.SimulatedFOPDT(), sp=333.15,          #
+#                      period=.01, iterations=3600, speed=100)             #
+# print(realtime.summary(stats))                                           #
+# ======================================================================== #
+
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy.integrate import odeint
+
+import closedloop
+from Air.firstPrinciplesAir import sim_air
+
+RunStats = namedtuple('RunStats', ['latency', 'jitter', 'missed', 'skipped', 'pv', 'op', 'elapsed'])
+
+# histogram bin edges (s), logarithmic from 1 us to 10 s
+BINS = np.logspace(-6, 1, 36)
+
+# full fan output (m^3/s) of the air step tests, two fans at fan_max
+AIR_FAN_FULL = .01878351 * 2
+
+
+class SimulatedFOPDT:
+    '''FOPDT plant from closedloop advanced exactly to the plant time of every read.'''
+
+    def __init__(self, plant=closedloop.AIR_PLANT, T0=300, u0=100, q=105, Ta=298):
+        self.plant = plant
+        self.T = float(T0)
+        self.u = float(u0)
+        self.q = q
+        self.Ta = Ta
+        self.t = 0.0
+
+    def start(self, t):
+        self.t = t
+
+    def read(self, t):
+        if t > self.t:
+            self.T = closedloop.plant_step(self.plant, self.T, self.u, self.q, self.Ta, t - self.t)
+            self.t = t
+        return self.T
+
+    def write(self, op, t):
+        self.read(t)
+        self.u = op
+
+
+class SimulatedODE:
+    '''
+    First-principles model with the odeint signature model(y, t, q, vol_air,
+    T_air), integrated up to the plant time of every read with the inputs
+    held. The controller output (%) is scaled by fan_full to vol_air. As in
+    the step tests, the model clock restarts at 0 in every integration call.
+    '''
+
+    def __init__(self, model=sim_air, y0=(298,), q=105, T_air=298, fan_full=AIR_FAN_FULL, u0=100):
+        self.model = model
+        self.y = np.array(y0, dtype=float)
+        self.q = q
+        self.T_air = T_air
+        self.fan_full = fan_full
+        self.vol_air = u0 / 100 * fan_full
+        self.t = 0.0
+
+    def start(self, t):
+        self.t = t
+
+    def read(self, t):
+        if t > self.t:
+            self.y = odeint(self.model, self.y, [0, t - self.t], args=(self.q, self.vol_air, self.T_air))[-1]
+            self.t = t
+        return self.y[0]
+
+    def write(self, op, t):
+        self.read(t)
+        self.vol_air = op / 100 * self.fan_full
+
+
+def run(controller, backend, sp, period, iterations=None, duration=None, speed=1.0,
+        clock=time.monotonic, sleep=time.sleep):
+    '''
+    Run controller against backend every period seconds (wall time) for
+    iterations releases, or until duration seconds have passed. sp is a
+    setpoint or a function of plant time. The plant time runs speed times
+    faster than the wall clock; the controller dt is the plant time between
+    iterations.
+    Returns RunStats with per-iteration latency, jitter, missed deadlines,
+    measurement and output, the number of skipped releases and the elapsed
+    wall time.
+    '''
+    if iterations is None:
+        if duration is None:
+            raise ValueError('give iterations or duration')
+        iterations = int(duration / period)
+    latency = np.empty(iterations)
+    jitter = np.empty(iterations)
+    missed = np.zeros(iterations, dtype=bool)
+    pv = np.empty(iterations)
+    op = np.empty(iterations)
+    skipped = 0
+
+    t0 = clock()
+    backend.start(0.0)
+    release = t0
+    last = None
+    k = 0
+    while k < iterations:
+        now = clock()
+        if duration is not None and now - t0 >= duration:
+            break
+        if now < release:
+            sleep(release - now)
+            now = clock()
+        t = (now - t0) * speed
+        setpoint = sp(t) if callable(sp) else sp
+        pv[k] = backend.read(t)
+        dt = period * speed if last is None else t - last
+        op[k] = controller.update(pv[k], setpoint, dt)
+        backend.write(op[k], t)
+        end = clock()
+        last = t
+
+        jitter[k] = now - release
+        latency[k] = end - now
+        release += period
+        if end > release:
+            missed[k] = True
+            # skip the releases that have passed instead of catching up
+            late = math.floor((end - release) / period) + 1
+            skipped += late
+            release += late * period
+        k += 1
+
+    return RunStats(latency[:k], jitter[:k], missed[:k], skipped, pv[:k], op[:k], clock() - t0)
+
+
+def histograms(stats, bins=BINS):
+    '''Histogram counts of latency and jitter over the bin edges bins (s).'''
+    return {'latency': np.histogram(stats.latency, bins)[0],
+            'jitter': np.histogram(stats.jitter, bins)[0],
+            'bins': bins}
+
+
+def summary(stats):
+    '''Percentiles of latency and jitter and the deadline-miss count as text.'''
+    lines = []
+    for name in ('latency', 'jitter'):
+        x = getattr(stats, name) * 1e6
+        if x.size == 0:
+            lines.append(f'{name}: no iterations')
+            continue
+        p50, p99 = np.percentile(x, [50, 99])
+        lines.append(f'{name}: median {p50:.1f} us, 99th percentile {p99:.1f} us, max {x.max():.1f} us')
+    lines.append(f'deadline misses: {stats.missed.sum()}/{len(stats.missed)}, '
+                 f'skipped releases: {stats.skipped}, elapsed {stats.elapsed:.2f} s')
+    return '\n'.join(lines)
@@ -0,0 +1,161 @@
+# ======================================================================== #
+# scenarios.py                                                             #
+#                                                                          #
+# Step-test scenarios defined as data and run in parallel.  A scenario     #
+# names the model ('air' for Air.firstPrinciplesAir.sim_air, 'water' for   #
+# Water.firstOrderWater.tempSim), the number of samples n and sample time  #
+# dt, the initial state y0, the output CSV and a schedule for each input   #
+# q, fan and T_air.  A schedule is a constant or a dict                    #
+#   {'initial': 1, 'changes': {300: .75, 600: .55}, 'scale': 2 * fan_max}  #
+# meaning x[i:] = value for every change, all times scale (default 1), as  #
+# built with disturbances.step_schedule.  Scenarios can be read from a     #
+# JSON list of such dicts (change indices as strings there).               #
+#                                                                          #
+# Every scenario is simulated with simulation.simulate in its own worker   #
+# process and streamed to its CSV by a telemetry.TelemetryWriter, which    #
+# gives the same bytes as the current step-test scripts; the checked-in    #
+# a_*_step.csv and w_*_step.csv files are generated by this runner.  The   #
+# summary table has the wall time of every scenario.                       #
+#                                                                          #
+# Run from the repository root:                                            #
+# python scenarios.py                      # the six STEP_TESTS            #
+# python scenarios.py runs.json --processes 4 --out-dir results            #
+# ======================================================================== #
+
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import disturbances
+import simulation
+import Air.firstPrinciplesAir as fpa
+import Water.firstOrderWater as fow
+from telemetry import TelemetryWriter, STEP_COLUMNS, WATER_COLUMNS
+
+# model function, Jacobian, CSV columns and simulate options of each model;
+# sim_air uses the solver time, so it keeps the per-sample clock
+MODELS = {
+    'air': (fpa.sim_air, fpa.sim_air_jac, STEP_COLUMNS, {'sample_clock': True}),
+    'water': (fow.tempSim, fow.tempSim_jac, WATER_COLUMNS, {}),
+}
+
+# options go to simulation.simulate (solver, substeps, rtol, ...); with
+# 'jac': True the model's analytic Jacobian is passed as well
+Scenario = namedtuple('Scenario', ['name', 'model', 'n', 'y0', 'q', 'fan', 'T_air', 'csv', 'dt', 'options'],
+                      defaults=(1.0, None))
+
+SUMMARY_COLUMNS = ['scenario', 'model', 'csv', 'samples', 'wall_time']
+
+Ta = 25 + 273.15  # ambient temperature of the step tests (K)
+q_max = 105  # W
+
+
+def _fan(initial, changes=None):
+    # fan schedule as a fraction of full flow, two fans of fan_max each
+    return {'initial': initial, 'changes': changes or {}, 'scale': fpa.fan_max * 2}
+
+
+# the step tests of Air/stepTestAir.py and Water/stepTestWater.py
+STEP_TESTS = [
+    Scenario('a_Fan_step', 'air', 3600, [Ta], 100,
+             _fan(1, {300: .75, 600: .55, 900: .85, 1200: .65, 1500: .6, 1800: .7, 2100: .8,
+                      2400: .9, 2700: .95, 3000: .6}), Ta, 'Air/a_Fan_step.csv'),
+    Scenario('a_q_step', 'air', 3600, [Ta], {'initial': 0, 'changes': {1800: q_max}}, _fan(.8), Ta,
+             'Air/a_q_step.csv'),
+    Scenario('a_Ta_step', 'air', 3600, [Ta], .8 * q_max, _fan(.8),
+             {'initial': Ta - 5, 'changes': {1800: Ta + 10}}, 'Air/a_Ta_step.csv'),
+    Scenario('w_Fan_step', 'water', 3600, [Ta, Ta], 100,
+             _fan(1, {300: .03, 600: .09, 900: .15, 1200: .21, 1500: .27, 1800: .33, 2100: .39,
+                      2400: .45, 2700: .51, 3000: .57}), Ta, 'Water/w_Fan_step.csv'),
+    Scenario('w_q_step', 'water', 3600, [Ta, Ta], {'initial': 0, 'changes': {1800: q_max}}, _fan(.8), Ta,
+             'Water/w_q_step.csv'),
+    Scenario('w_Ta_step', 'water', 3600, [Ta, Ta], .8 * q_max, _fan(.8),
+             {'initial': Ta - 5, 'changes': {1800: Ta + 10}}, 'Water/w_Ta_step.csv'),
+]
+
+
+def schedule(spec, steps):
+    '''Input profile of steps samples from a constant or a schedule dict.'''
+    if not isinstance(spec, dict):
+        return np.full(steps, float(spec))
+    unknown = set(spec) - {'initial', 'changes', 'scale'}
+    if unknown:
+        raise ValueError(f'unknown schedule keys {sorted(unknown)}')
+    changes = {int(i): v for i, v in spec.get('changes', {}).items()}
+    x = disturbances.step_schedule(steps, spec['initial'], changes)
+    if 'scale' in spec:
+        x = x * spec['scale']
+    return x
+
+
+def inputs(scenario):
+    '''time, q, fan and T_air arrays of a scenario.'''
+    steps = scenario.n + 1
+    time = np.linspace(0, scenario.n * scenario.dt, steps)
+    return (time,) + tuple(schedule(spec, steps) for spec in (scenario.q, scenario.fan, scenario.T_air))
+
+
+def load(path):
+    '''Scenarios from a JSON list of dicts with the Scenario fields.'''
+    with open(path) as f:
+        return [Scenario(**d) for d in json.load(f)]
+
+
+def run_scenario(scenario, out_dir=None):
+    '''Simulate one scenario into its CSV and return its summary row.'''
+    start = time.perf_counter()
+    if scenario.model not in MODELS:
+        raise ValueError(f'{scenario.name}: model must be one of {tuple(MODELS)}, got {scenario.model!r}')
+    model, jac, columns, kw = MODELS[scenario.model]
+    options = dict(kw, **(scenario.options or {}))
+    if options.pop('jac', False):
+        options['jac'] = jac
+    path = scenario.csv if out_dir is None else os.path.join(out_dir, os.path.basename(scenario.csv))
+    t, q, fan, T_air = inputs(scenario)
+    with TelemetryWriter(path, columns) as sink:
+        simulation.simulate(model, scenario.y0, t, q, fan, T_air, sink=sink, **options)
+    return {'scenario': scenario.name, 'model': scenario.model, 'csv': path, 'samples': len(t),
+            'wall_time': time.perf_counter() - start}
+
+
+def run(scenarios, processes=None, out_dir=None):
+    '''
+    Run every scenario in its own worker process and return the summary
+    table (one row per scenario with its wall time) in scenario order.
+    The CSVs go to the scenario paths, or into out_dir by file name.
+    processes=1 runs them in this process.
+    '''
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    if processes == 1:
+        rows = [run_scenario(s, out_dir) for s in scenarios]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(run_scenario, s, out_dir) for s in scenarios]
+            rows = [f.result() for f in futures]
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run step-test scenarios in parallel.')
+    parser.add_argument('files', nargs='*', help='JSON scenario files (default: the built-in step tests)')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--out-dir', default=None, help='write the CSVs here instead of the scenario paths')
+    args = parser.parse_args(argv)
+
+    scenarios = [s for path in args.files for s in load(path)] if args.files else STEP_TESTS
+    start = time.perf_counter()
+    summary = run(scenarios, args.processes, args.out_dir)
+    print(summary.to_string(index=False))
+    print(f'{len(summary)} scenarios in {time.perf_counter() - start:.2f} s '
+          f'(sum of scenario times {summary["wall_time"].sum():.2f} s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# ======================================================================== #
+# simulation.py                                                            #
+#                                                                          #
+# Simulation engine for the step tests.  A model has the odeint signature  #
+# model(y, t, q, vol_air, T_air) (Water.firstOrderWater.tempSim and        #
+# Air.firstPrinciplesAir.sim_air).  The inputs are sampled arrays that     #
+# are held constant between samples: the value at sample i applies from    #
+# time[i] to time[i+1].  Instead of one odeint call per sample, the        #
+# horizon is split at the samples where an input changes and each         #
+# constant-input segment is integrated in one odeint call that reports     #
+# every sample time.                                                       #
+#                                                                          #
+# The solver is selectable: odeint (default), the solve_ivp methods LSODA, #
+# BDF and Radau, or 'implicit', the fixed-step trapezoidal rule with a     #
+# Newton iteration.  A model Jacobian jac(y, t, q, vol_air, T_air), such   #
+# as Water.firstOrderWater.tempSim_jac, is passed to every solver that     #
+# uses one instead of a finite-difference estimate.                        #
+#                                                                          #
+# 'rk4' and 'expeuler' are the fixed-step explicit steppers of             #
+# fixedstep.py (substeps steps per sample; expeuler needs jac), whose     #
+# work per step is fixed for real-time plant emulation.                    #
+# ======================================================================== #
+
+import numpy as np
+from scipy.integrate import odeint, solve_ivp
+
+import fixedstep
+
+SOLVERS = ('odeint', 'LSODA', 'BDF', 'Radau', 'implicit') + fixedstep.METHODS
+
+
+def input_segments(*inputs):
+    '''
+    Start and end sample indices of the segments over which all inputs are
+    constant. A segment (a, b) covers time[a] to time[b] using the inputs
+    at sample a.
+    '''
+    n = len(inputs[0]) - 1
+    change = np.zeros(n, dtype=bool)
+    for u in inputs:
+        u = np.asarray(u)
+        change[1:] |= u[1:n] != u[:n-1]
+    starts = [0] + np.flatnonzero(change).tolist()
+    return list(zip(starts, starts[1:] + [n]))
+
+
+def implicit_trapezoid(model, y0, t, args=(), jac=None, h=None, tol=1e-10, maxiter=20):
+    '''
+    Fixed-step trapezoidal rule (A-stable, second order) for y' = model(y, t,
+    *args), reporting the states at the times t. Every interval between
+    output times is split into equal steps of at most h (default: the
+    interval). The implicit equation is solved by a simplified Newton
+    iteration with jac at the start of the step or, without it, a
+    finite-difference Jacobian.
+    '''
+    t = np.asarray(t, dtype=float)
+    y = np.array(y0, dtype=float)
+    n = len(y)
+    out = np.empty((len(t), n))
+    out[0] = y
+    eye = np.eye(n)
+
+    def jacobian(x, tk):
+        if jac is not None:
+            return jac(x, tk, *args)
+        f0 = np.asarray(model(x, tk, *args))
+        J = np.empty((n, n))
+        for j in range(n):
+            dx = 1e-7 * max(1.0, abs(x[j]))
+            x1 = x.copy()
+            x1[j] += dx
+            J[:, j] = (np.asarray(model(x1, tk, *args)) - f0) / dx
+        return J
+
+    for i in range(len(t) - 1):
+        span = t[i+1] - t[i]
+        steps = 1 if h is None else max(1, int(np.ceil(span / h - 1e-12)))
+        dt = span / steps
+        tk = t[i]
+        for _ in range(steps):
+            f0 = np.asarray(model(y, tk, *args))
+            y1 = y + dt * f0  # explicit Euler predictor
+            # simplified Newton: one Jacobian per step
+            M = eye - .5 * dt * jacobian(y, tk)
+            for _ in range(maxiter):
+                G = y1 - y - .5 * dt * (f0 + np.asarray(model(y1, tk + dt, *args)))
+                dy = np.linalg.solve(M, G)
+                y1 = y1 - dy
+                if np.max(np.abs(dy)) <= tol * (1 + np.max(np.abs(y1))):
+                    break
+            y = y1
+            tk += dt
+        out[i+1] = y
+    return out
+
+
+def integrate(model, y0, t, args=(), solver='odeint', jac=None, **solver_kw):
+    '''States of model(y, t, *args) at the times t with the chosen solver (see SOLVERS).'''
+    if solver == 'odeint':
+        return odeint(model, y0, t, args=args, Dfun=jac, **solver_kw)
+    if solver == 'implicit':
+        return implicit_trapezoid(model, y0, t, args, jac, **solver_kw)
+    if solver in fixedstep.METHODS:
+        return fixedstep.integrate(model, y0, t, args, solver, jac, **solver_kw)
+    if solver not in SOLVERS:
+        raise ValueError(f'solver must be one of {SOLVERS}, got {solver!r}')
+    if jac is not None:
+        solver_kw['jac'] = lambda tk, y: jac(y, tk, *args)
+    sol = solve_ivp(lambda tk, y: model(y, tk, *args), (t[0], t[-1]), y0, method=solver, t_eval=t,
+                    **solver_kw)
+    if not sol.success:
+        raise RuntimeError(f'{solver} failed: {sol.message}')
+    return sol.y.T
+
+
+def _emit(sink, time, states, q, fan, T_air, a, b):
+    # rows a to b-1 in the step-test column order: Time, states, Fan, Q, T_air
+    sink.extend(np.column_stack((time[a:b], states[a:b], fan[a:b], q[a:b], T_air[a:b])))
+
+
+def simulate(model, y0, time, q, fan, T_air, sample_clock=False, sink=None, solver='odeint', jac=None,
+             **solver_kw):
+    '''
+    Integrate model over time with sample-and-hold inputs q, fan and T_air.
+
+    Returns the states at every sample, shape (len(time), len(y0)).
+
+    Models that read the time argument see the time since the start of
+    their integration call. The step-test scripts originally restarted
+    odeint every sample, so such a model saw a clock that ran from 0 to dt
+    in every sample. sim_air is one of these models, because it uses t in
+    its fin parameter. sample_clock=True keeps that one-call-per-sample
+    integration so those models reproduce the original step tests.
+
+    With sink (a telemetry.TelemetryWriter with the step-test columns),
+    the samples are also streamed to it as they are computed.
+
+    solver picks the integrator (see SOLVERS) and jac is the model
+    Jacobian with the model signature; solver_kw go to the solver
+    (rtol, atol, h for 'implicit', substeps for 'rk4' and
+    'expeuler', ...).
+    '''
+    time = np.asarray(time, dtype=float)
+    y = np.array(y0, dtype=float, ndmin=1)
+    states = np.empty((len(time), len(y)))
+    states[0] = y
+    if sample_clock:
+        for i in range(len(time) - 1):
+            sol = integrate(model, y, [0, time[i+1] - time[i]], (q[i], fan[i], T_air[i]), solver, jac,
+                            **solver_kw)
+            y = sol[-1]
+            states[i+1] = y
+            if sink is not None:
+                _emit(sink, time, states, q, fan, T_air, i, i+1)
+        if sink is not None:
+            _emit(sink, time, states, q, fan, T_air, len(time) - 1, len(time))
+        return states
+    for a, b in input_segments(q, fan, T_air):
+        sol = integrate(model, y, time[a:b+1] - time[a], (q[a], fan[a], T_air[a]), solver, jac, **solver_kw)
+        states[a+1:b+1] = sol[1:]
+        y = sol[-1]
+        if sink is not None:
+            _emit(sink, time, states, q, fan, T_air, a, b)
+    if sink is not None:
+        _emit(sink, time, states, q, fan, T_air, len(time) - 1, len(time))
+    return states
@@ -0,0 +1,129 @@
+# ======================================================================== #
+# stepdata.py                                                              #
+#                                                                          #
+# Columnar binary format for step-test data (.step files) and a            #
+# memory-mapped loader.  Loading maps the file and returns every column as #
+# a zero-copy float64 view, so fits and plots of long traces do not parse  #
+# or copy anything up front.                                               #
+#                                                                          #
+# Layout (little endian):                                                  #
+#   magic    8 bytes   b'STEPDAT1'                                         #
+#   ncols    uint32                                                        #
+#   nrows    uint64                                                        #
+#   names    ncols x 16 bytes, ASCII, NUL padded                           #
+#   padding  to a multiple of 64 bytes                                     #
+#   data     ncols x nrows float64, column after column                    #
+#                                                                          #
+# stepdata.from_csv('a_Fan_step.csv')        # writes a_Fan_step.step      #
+# data = stepdata.load('a_Fan_step.step')    # {'Time': ..., 'Tcpu': ...}  #
+# data = stepdata.load_step_test('a_Fan_step.csv')  # converts when stale  #
+# ======================================================================== #
+
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'STEPDAT1'
+NAME_BYTES = 16
+ALIGN = 64
+FIXED = struct.Struct('<8sIQ')
+
+# columns of the step-test CSVs, in file order
+COLUMNS = ('Time', 'Tcpu', 'Tw', 'Fan', 'Q', 'T_air')
+
+
+def _header(names, nrows):
+    head = FIXED.pack(MAGIC, len(names), nrows)
+    for name in names:
+        encoded = name.encode('ascii')
+        if len(encoded) > NAME_BYTES:
+            raise ValueError(f'column name {name!r} is longer than {NAME_BYTES} bytes')
+        head += encoded.ljust(NAME_BYTES, b'\0')
+    return head.ljust(-(-len(head) // ALIGN) * ALIGN, b'\0')
+
+
+def read_header(path):
+    '''Column names, row count and data offset (bytes) of a .step file.'''
+    with open(path, 'rb') as f:
+        magic, ncols, nrows = FIXED.unpack(f.read(FIXED.size))
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a step data file')
+        names = [f.read(NAME_BYTES).rstrip(b'\0').decode('ascii') for _ in range(ncols)]
+    offset = -(-(FIXED.size + ncols * NAME_BYTES) // ALIGN) * ALIGN
+    return names, nrows, offset
+
+
+def create(path, names, nrows):
+    '''New .step file; returns a writable (ncols, nrows) memmap of its data.'''
+    head = _header(names, nrows)
+    with open(path, 'wb') as f:
+        f.write(head)
+    return np.memmap(path, dtype='<f8', mode='r+', offset=len(head), shape=(len(names), nrows))
+
+
+def write(path, columns):
+    '''Write a dict from column name to 1-D array (all the same length).'''
+    names = list(columns)
+    nrows = len(columns[names[0]])
+    data = create(path, names, nrows)
+    for j, name in enumerate(names):
+        data[j] = columns[name]
+    data.flush()
+    del data
+
+
+def load(path, mode='r'):
+    '''
+    Dict from column name to a zero-copy memmap view of that column.
+    mode='r+' maps the file writable, 'c' copy-on-write.
+    '''
+    names, nrows, offset = read_header(path)
+    data = np.memmap(path, dtype='<f8', mode=mode, offset=offset, shape=(len(names), nrows))
+    return {name: data[j] for j, name in enumerate(names)}
+
+
+def _count_rows(path):
+    with open(path, 'rb') as f:
+        lines = sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b''))
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            lines += 1
+    return lines - 1
+
+
+def from_csv(csv_path, out=None, chunksize=100000):
+    '''
+    Convert a step-test CSV (index column first) into a .step file, by
+    default next to it, reading chunksize rows at a time. The columns of
+    the CSV are kept in COLUMNS order, followed by any others.
+    '''
+    if out is None:
+        out = os.path.splitext(csv_path)[0] + '.step'
+    header = pd.read_csv(csv_path, index_col=0, nrows=0).columns
+    names = [c for c in COLUMNS if c in header] + [c for c in header if c not in COLUMNS]
+    nrows = _count_rows(csv_path)
+    data = create(out, names, nrows)
+    i = 0
+    for chunk in pd.read_csv(csv_path, index_col=0, chunksize=chunksize, dtype=float):
+        m = len(chunk)
+        for j, name in enumerate(names):
+            data[j, i:i + m] = chunk[name].to_numpy()
+        i += m
+    data.flush()
+    del data
+    if i != nrows:
+        raise ValueError(f'{csv_path}: expected {nrows} rows, read {i}')
+    return out
+
+
+def load_step_test(csv_path, mode='r'):
+    '''
+    Columns of a step-test CSV through its .step file, which is (re)built
+    from the CSV when it is missing or older than the CSV.
+    '''
+    step_path = os.path.splitext(csv_path)[0] + '.step'
+    if not os.path.exists(step_path) or os.path.getmtime(step_path) < os.path.getmtime(csv_path):
+        from_csv(csv_path, step_path)
+    return load(step_path, mode)
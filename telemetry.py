@@ -0,0 +1,201 @@
+# ======================================================================== #
+# telemetry.py                                                             #
+#                                                                          #
+# Streaming telemetry sink for long simulations and controller runs.       #
+# Records are collected into chunks of chunk rows; full chunks go through  #
+# a queue holding at most max_chunks chunks to a background thread that    #
+# appends them to disk, so memory stays bounded (a producer that gets      #
+# ahead of the disk waits) and a crash loses at most the unwritten chunks. #
+#                                                                          #
+# csv      one file in the df.to_csv layout of the step-test CSVs: an      #
+#          unnamed index column, then the columns                          #
+# parquet  a directory of part-00000.parquet, part-00001.parquet, ...      #
+#          (needs pyarrow or fastparquet)                                  #
+#                                                                          #
+# with telemetry.TelemetryWriter('a_Fan_step.csv', telemetry.STEP_COLUMNS) #
+#         as sink:                                                         #
+#     temps = simulate(sim_air, [Ta], time, q, fan, T_air, sink=sink)     #
+# for chunk in telemetry.follow('a_Fan_step.csv'):  # while it is written  #
+#     print(chunk.tail(1))                                                 #
+# ======================================================================== #
+
+import glob
+import io
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# columns of the air and water step-test CSVs
+STEP_COLUMNS = ('Time', 'Tcpu', 'Fan', 'Q', 'T_air')
+WATER_COLUMNS = ('Time', 'Tcpu', 'Tw', 'Fan', 'Q', 'T_air')
+
+FORMATS = ('csv', 'parquet')
+
+
+class TelemetryWriter:
+    '''
+    Append rows with the given columns to path in chunks of chunk rows,
+    written by a background thread. format is 'csv' or 'parquet' (default
+    from the extension). Use as a context manager or call close().
+    '''
+
+    def __init__(self, path, columns, format=None, chunk=1000, max_chunks=8):
+        if format is None:
+            format = 'parquet' if path.endswith('.parquet') else 'csv'
+        if format not in FORMATS:
+            raise ValueError(f'format must be one of {FORMATS}, got {format!r}')
+        self.path = path
+        self.columns = list(columns)
+        self.format = format
+        self.chunk = chunk
+        self.rows = 0  # rows handed to the writer thread
+        self._buffer = np.empty((chunk, len(self.columns)))
+        self._n = 0
+        self._parts = 0
+        self._error = None
+        self._queue = queue.Queue(max_chunks)
+
+        if format == 'csv':
+            # header now, so followers can open the file right away
+            pd.DataFrame(columns=self.columns).to_csv(path)
+        else:
+            pd.io.parquet.get_engine('auto')  # ImportError now rather than at the first chunk
+            os.makedirs(path, exist_ok=True)
+            for part in glob.glob(os.path.join(path, 'part-*.parquet')):
+                os.remove(part)
+        self._thread = threading.Thread(target=self._flush_chunks, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, row):
+        '''Append one record, a sequence of values in column order.'''
+        self._buffer[self._n] = row
+        self._n += 1
+        if self._n == self.chunk:
+            self._hand_off()
+
+    def extend(self, rows):
+        '''Append a 2-D array of records, one per row.'''
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(self.columns))
+        while len(rows):
+            m = min(self.chunk - self._n, len(rows))
+            self._buffer[self._n:self._n + m] = rows[:m]
+            self._n += m
+            rows = rows[m:]
+            if self._n == self.chunk:
+                self._hand_off()
+
+    def flush(self):
+        '''Hand the partly filled chunk to the writer and wait until everything is on disk.'''
+        if self._n:
+            self._hand_off()
+        self._queue.join()
+        self._raise()
+
+    def close(self):
+        if self._thread is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise()
+
+    def _hand_off(self):
+        self._raise()
+        frame = pd.DataFrame(self._buffer[:self._n].copy(), columns=self.columns,
+                             index=pd.RangeIndex(self.rows, self.rows + self._n))
+        self._queue.put(frame)  # waits while max_chunks chunks are pending
+        self.rows += self._n
+        self._n = 0
+
+    def _raise(self):
+        if self._error is not None:
+            raise RuntimeError(f'writing {self.path} failed') from self._error
+
+    def _flush_chunks(self):
+        while True:
+            frame = self._queue.get()
+            try:
+                if frame is None:
+                    return
+                if self._error is None:
+                    self._write(frame)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, frame):
+        if self.format == 'csv':
+            with open(self.path, 'a', newline='') as f:
+                frame.to_csv(f, header=False)
+        else:
+            # write under a temporary name so followers never see half a part
+            part = os.path.join(self.path, f'part-{self._parts:05d}.parquet')
+            frame.to_parquet(part + '.tmp', engine='auto', index=True)
+            os.replace(part + '.tmp', part)
+            self._parts += 1
+
+
+def read(path):
+    '''Everything written so far to a CSV file or parquet directory.'''
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, 'part-*.parquet')))
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat([pd.read_parquet(p) for p in parts])
+    return pd.read_csv(path, index_col=0)
+
+
+def follow(path, poll=.5, idle_timeout=None):
+    '''
+    Yield the new rows of a CSV file or parquet directory as DataFrames while
+    it is being written. Only complete lines (or parts) are returned. Stops
+    after idle_timeout seconds without new data (None follows forever).
+    '''
+    last = time.monotonic()
+    if os.path.isdir(path):
+        seen = 0
+        while True:
+            parts = sorted(glob.glob(os.path.join(path, 'part-*.parquet')))
+            if len(parts) > seen:
+                yield pd.concat([pd.read_parquet(p) for p in parts[seen:]])
+                seen = len(parts)
+                last = time.monotonic()
+            elif idle_timeout is not None and time.monotonic() - last > idle_timeout:
+                return
+            else:
+                time.sleep(poll)
+
+    with open(path, newline='') as f:
+        header = f.readline()
+        while not header.endswith('\n'):
+            time.sleep(poll)
+            header += f.readline()
+        names = header.rstrip('\r\n').split(',')
+        pending = ''
+        while True:
+            pending += f.read()
+            end = pending.rfind('\n') + 1
+            if end:
+                lines, pending = pending[:end], pending[end:]
+                chunk = pd.read_csv(io.StringIO(lines), header=None, names=names, index_col=0)
+                chunk.index.name = None
+                yield chunk
+                last = time.monotonic()
+            elif idle_timeout is not None and time.monotonic() - last > idle_timeout:
+                return
+            else:
+                time.sleep(poll)
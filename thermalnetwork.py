@@ -0,0 +1,190 @@
+# ======================================================================== #
+# thermalnetwork.py                                                        #
+#                                                                          #
+# Lumped thermal network models defined as data.  Nodes have a heat        #
+# capacity, links a thermal conductance (W/K) between two nodes or a node  #
+# and a boundary temperature taken from the inputs, and sources feed an    #
+# input heat rate (W) into a node.  With X the node temperatures followed  #
+# by the boundary temperatures and B the link incidence matrix (+1 at the  #
+# first end, -1 at the second), the heat flows are f = g * (B X) and       #
+#   C dT/dt = Q - B_nodes^T f                                              #
+# which is evaluated for a batch of states at once.  Capacities and        #
+# conductances may depend on one node temperature (water properties) and   #
+# on the inputs (fan flow, air temperature); with their derivatives the    #
+# network also gives the analytic Jacobian d(dT/dt)/dT for stiff solvers.  #
+#                                                                          #
+# net = ThermalNetwork(nodes=('cpu', 'liquid'),                            #
+#                      capacity={'cpu': 32, 'liquid': 4180},               #
+#                      links=[Link('cpu', 'liquid', 2.0),                  #
+#                             Link('liquid', 'T_air', 5.0)],               #
+#                      sources={'cpu': 'q'}, boundaries=('T_air',))        #
+# net.derivative([330, 310], {'q': 100, 'T_air': 298})                     #
+# ======================================================================== #
+
+from collections import namedtuple
+
+import numpy as np
+
+# g is a conductance (W/K) or a function g(T_on, inputs) of the temperature
+# of node on (None when it depends on the inputs only); dg(T_on, inputs, g)
+# is its derivative with respect to that temperature, given the conductance
+Link = namedtuple('Link', ['a', 'b', 'g', 'dg', 'on'], defaults=(None, None))
+
+# heat capacity (J/K) as a function of the node temperature and its derivative
+Capacity = namedtuple('Capacity', ['c', 'dc'])
+
+
+class ThermalNetwork:
+    '''
+    Network of nodes (names in state order) with capacity a dict from node
+    to a heat capacity (J/K) or a Capacity, links a list of Link, sources a
+    dict from node to the name of its heat input and boundaries the names
+    of the boundary temperature inputs.
+    '''
+
+    def __init__(self, nodes, capacity, links, sources=None, boundaries=()):
+        self.nodes = tuple(nodes)
+        self.boundaries = tuple(boundaries)
+        self.links = list(links)
+        self.sources = dict(sources or {})
+        n = len(self.nodes)
+        index = {name: i for i, name in enumerate(self.nodes + self.boundaries)}
+        for name in list(capacity) + list(self.sources):
+            if name not in self.nodes:
+                raise ValueError(f'unknown node {name!r}')
+
+        self.B = np.zeros((len(self.links), n + len(self.boundaries)))
+        for k, link in enumerate(self.links):
+            for end in (link.a, link.b):
+                if end not in index:
+                    raise ValueError(f'link {link.a!r}-{link.b!r}: unknown node or boundary {end!r}')
+            if link.a == link.b:
+                raise ValueError(f'link {link.a!r}-{link.b!r} connects a node to itself')
+            if link.on is not None and link.on not in self.nodes:
+                raise ValueError(f'link {link.a!r}-{link.b!r} depends on unknown node {link.on!r}')
+            self.B[k, index[link.a]] = 1
+            self.B[k, index[link.b]] = -1
+        self.Bn = self.B[:, :n]
+        self._on = [None if link.on is None else index[link.on] for link in self.links]
+
+        self._c = np.empty(n)
+        self._c_var = []  # (node index, Capacity) of temperature dependent capacities
+        for i, name in enumerate(self.nodes):
+            c = capacity[name]
+            if isinstance(c, Capacity):
+                self._c_var.append((i, c))
+                self._c[i] = np.nan
+            else:
+                self._c[i] = c
+        self._src = [(index[node], name) for node, name in self.sources.items()]
+
+    def _capacity(self, T, derivative=False):
+        C = np.broadcast_to(self._c, T.shape).copy()
+        dC = np.zeros(T.shape) if derivative else None
+        for i, c in self._c_var:
+            C[:, i] = c.c(T[:, i])
+            if derivative:
+                dC[:, i] = c.dc(T[:, i])
+        return C, dC
+
+    def _conductance(self, T, inputs, derivative=False):
+        g = np.empty((len(T), len(self.links)))
+        dg = np.zeros(g.shape) if derivative else None
+        for k, (link, on) in enumerate(zip(self.links, self._on)):
+            if not callable(link.g):
+                g[:, k] = link.g
+                continue
+            T_on = None if on is None else T[:, on]
+            g[:, k] = link.g(T_on, inputs)
+            if derivative and link.dg is not None:
+                dg[:, k] = link.dg(T_on, inputs, g[:, k])
+        return g, dg
+
+    def _flows(self, T, inputs):
+        # temperature difference across every link
+        X = T
+        if self.boundaries:
+            Tb = np.column_stack([np.broadcast_to(np.asarray(inputs[b], dtype=float), len(T))
+                                  for b in self.boundaries])
+            X = np.hstack((T, Tb))
+        return X @ self.B.T
+
+    def _heat(self, inputs, g, dX):
+        Q = -(g * dX) @ self.Bn
+        for i, name in self._src:
+            Q[:, i] += inputs[name]
+        return Q
+
+    def _single(self, T, inputs, derivative=False):
+        # one state: the property functions see python floats, which is
+        # much cheaper than numpy operations on one-element arrays
+        X = T.tolist() + [inputs[b] for b in self.boundaries]
+        g = []
+        dg = []
+        for link, on in zip(self.links, self._on):
+            if not callable(link.g):
+                g.append(link.g)
+                dg.append(0.0)
+                continue
+            T_on = None if on is None else X[on]
+            g.append(link.g(T_on, inputs))
+            if derivative:
+                dg.append(0.0 if link.dg is None else link.dg(T_on, inputs, g[-1]))
+        C = self._c.copy()
+        dC = np.zeros(len(C))
+        for i, c in self._c_var:
+            C[i] = c.c(X[i])
+            if derivative:
+                dC[i] = c.dc(X[i])
+        g = np.array(g)
+        dX = self.B @ X
+        Q = -(g * dX) @ self.Bn
+        for i, name in self._src:
+            Q[i] += inputs[name]
+        return g, np.array(dg), C, dC, dX, Q
+
+    def derivative(self, T, inputs):
+        '''dT/dt for states T, shape (n,) or (batch, n); inputs is a dict of scalars or (batch,) arrays.'''
+        T = np.asarray(T, dtype=float)
+        if T.ndim == 1:
+            g, dg, C, dC, dX, Q = self._single(T, inputs)
+            return Q / C
+        g, _ = self._conductance(T, inputs)
+        C, _ = self._capacity(T)
+        return self._heat(inputs, g, self._flows(T, inputs)) / C
+
+    def jacobian(self, T, inputs):
+        '''d(dT/dt)/dT, shape (n, n) or (batch, n, n).'''
+        T = np.asarray(T, dtype=float)
+        if T.ndim == 1:
+            g, dg, C, dC, dX, Q = self._single(T, inputs, derivative=True)
+            g, dg, C, dC, dX, Q = g[None], dg[None], C[None], dC[None], dX[None], Q[None]
+        else:
+            g, dg = self._conductance(T, inputs, derivative=True)
+            C, dC = self._capacity(T, derivative=True)
+            dX = self._flows(T, inputs)
+            Q = self._heat(inputs, g, dX)
+
+        # heat flow term with the conductances held, then their dependence on T
+        dQ = -np.einsum('ki,bk,kj->bij', self.Bn, g, self.Bn)
+        for k, on in enumerate(self._on):
+            if on is not None:
+                dQ[:, :, on] -= self.Bn[k] * (dg[:, k] * dX[:, k])[:, None]
+        J = dQ / C[:, :, None]
+        # capacity dependence on the node's own temperature
+        diag = np.arange(len(self.nodes))
+        J[:, diag, diag] -= Q * dC / C**2
+        return J.reshape(T.shape + (len(self.nodes),))
+
+    def odeint_model(self, input_names):
+        '''
+        Functions f(y, t, *inputs) and jac(y, t, *inputs) for odeint, with
+        the inputs passed in the order of input_names.
+        '''
+        def f(y, t, *args):
+            return self.derivative(y, dict(zip(input_names, args)))
+
+        def jac(y, t, *args):
+            return self.jacobian(y, dict(zip(input_names, args)))
+
+        return f, jac
@@ -64,13 +64,17 @@
 # acen        acentric factor                          none                #
 # ldn(t)      liquid density in kg/m**3                temperature in K    #
 # lcp(t)      liquid heat capacity in J/mol/K          temperature in K    #
+# dlcpdt(t)   derivative of lcp in J/mol/K**2          temperature in K    #
 # ltc(t)      liquid thermal conductivity in W/m/K     temperature in K    #
+# dltcdt(t)   derivative of ltc in W/m/K**2            temperature in K    #
 # vp(t)       liquid vapor pressure in Pa              temperature in K    #
+# dvpdt(t)    derivative of vp in Pa/K                 temperature in K    #
 # hvp(t)      heat of vaporization in J/mol            temperature in K    # 
 # pr(t)       Prandtl number                           temperature in K    #
 # lvs(t)      liquid viscosity in Pa*s                 temperature in K    #
 # nu(t)       liquid kinematic viscosity in m**2/s     temperature in K    #
 # tsat(p)     temperature at saturation in K           pressure in Pa      #
+#             (p may be a scalar or an array)                              #
 # vvs(t)      vapor (steam) viscosity in Pa*s          temperature in K    #
 # vtc(t)      vapor (steam) therm. conductiv. in W/m/K temperature in K    #
 # vdnsat(t)   vapor (steam) density at saturation      temperature in K    #
@@ -132,6 +136,23 @@ def ltc(t): # liquid thermal conductivity
     y = A + B * t + C * t**2 + D * t**3 + E * t**4
     return y # units of W/m/K
 
+def dlcpdt(t): # derivative of the liquid heat capacity
+    B = -2.0901E+03
+    C = 8.1250E+00
+    D = -1.4116E-02
+    E = 9.3701E-06
+    y = B + 2 * C * t + 3 * D * t**2 + 4 * E * t**3
+    y = y / 1000 # convert from J/kmol/K**2 to J/mol/K**2
+    return y # units of J/mol/K**2
+
+def dltcdt(t): # derivative of the liquid thermal conductivity
+    B = 5.7255E-03
+    C = -8.0780E-06
+    D = 1.8610E-09
+    E = 0
+    y = B + 2 * C * t + 3 * D * t**2 + 4 * E * t**3
+    return y # units of W/m/K**2
+
 def vp(t): # liquid vapor pressure
     A = 7.3649E+01
     B = -7.2582E+03
@@ -166,13 +187,50 @@ def nu(t): # kinematic liquid viscosity
 def pr(t): # Prandtl number
     return lcp(t)*lvs(t)/ltc(t)/mw # unitless
 
+def dvpdt(t): # derivative of the liquid vapor pressure
+    B = -7.2582E+03
+    C = -7.3037E+00
+    D = 4.1653E-06
+    E = 2.0000E+00
+    y = vp(t) * (-B / t**2 + C / t + D * E * t**(E-1))
+    return y # units of Pa/K
+
 def ftsat(t,p): # function to calculate tsat with fsolve
     return vp(t) - p
 
-def tsat(p): # saturation temperature (K) at pressure p (Pa)
+def tsat_fsolve(p): # saturation temperature (K) at a single pressure p (Pa)
     x = 700 # guess in K
     y = fsolve(ftsat,x,p)
     return(y[0]) # K
+
+def tsat(p, xtol=1.49012E-08, maxiter=50): # saturation temperature (K) at pressure p (Pa)
+    # Newton iteration on ln(vp(t)) = ln(p) for every pressure at once,
+    # starting from a Clausius-Clapeyron estimate around the normal
+    # boiling point. Points that do not converge are solved with fsolve.
+    p = np.asarray(p, dtype=float)
+    lnp = np.log(p)
+    with np.errstate(all='ignore'):
+        t = 1.0 / (1.0/373.15 - (lnp - np.log(101325.0)) / 4890.0)
+        t = np.clip(np.where(t > 0, t, tc), 200.0, tc)
+        converged = np.zeros(p.shape, dtype=bool)
+        for i in range(maxiter):
+            f = vp(t)
+            dt = (np.log(f) - lnp) * f / dvpdt(t)
+            t = t - dt
+            converged = np.abs(dt) <= xtol * np.abs(t)
+            if converged.all():
+                break
+    failed = ~(converged & np.isfinite(t) & (t > 0))
+    if failed.any():
+        # flat views, so the mask also works for pressure arrays of any shape
+        tf = np.array(t, dtype=float).ravel()
+        pf = p.ravel()
+        mask = failed.ravel()
+        tf[mask] = [tsat_fsolve(pi) for pi in pf[mask]]
+        t = tf.reshape(p.shape)
+    if t.ndim == 0:
+        return float(t)
+    return t # K
     
 def vvs(t): # vapor (steam) viscosity
     A = 1.7096E-08
@@ -184,11 +242,12 @@ def vtc(t): # vapor (steam) thermal conductivity
     B = 1.1146
     return A*t**B # W/m/K   
 
+# saturated steam specific volume data from Bergman et. al.; the spline is
+# fit once at import
+tdata = [273.15,275,280,285,290,295,300,305,310,315,320,325,330,335,340,345,350,355,360,365,370,373.15,375,380,385,390,400,410,420,430]
+ddata = [206.3,181.7,130.4,99.4,69.7,51.94,39.13,29.74,22.93,17.82,13.98,11.06,8.82,7.09,5.74,4.683,3.846,3.18,2.645,2.212,1.861,1.679,1.574,1.337,1.142,0.98,0.731,0.553,0.425,0.331]
+vdnsat_tck = interpolate.splrep(tdata,ddata)
+
 def vdnsat(t): # saturated vapor (steam) density   
-    tdata = [273.15,275,280,285,290,295,300,305,310,315,320,325,330,335,340,345,350,355,360,365,370,373.15,375,380,385,390,400,410,420,430]
-    ddata = [206.3,181.7,130.4,99.4,69.7,51.94,39.13,29.74,22.93,17.82,13.98,11.06,8.82,7.09,5.74,4.683,3.846,3.18,2.645,2.212,1.861,1.679,1.574,1.337,1.142,0.98,0.731,0.553,0.425,0.331]
-    tck = interpolate.splrep(tdata,ddata)
-    y=interpolate.splev(t,tck)
+    y=interpolate.splev(t,vdnsat_tck)
     return 1.0/y # kg/m**3
-
-  